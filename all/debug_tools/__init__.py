@@ -36,8 +36,46 @@
 #########################################################################################
 #
 
-from .utilities import SleepEvent
-from .logger import getLogger
-from .version import __version__
+import sys
 
-from .std_capture import TeeNoFile
+# The package attributes and the submodules defining them
+_lazy_attributes = {
+    "SleepEvent": "utilities",
+    "getLogger": "logger",
+    "lazy": "logger",
+    "__version__": "version",
+    "TeeNoFile": "std_capture",
+}
+
+if sys.version_info < (3, 7):
+    from .utilities import SleepEvent
+    from .logger import getLogger
+    from .logger import lazy
+    from .version import __version__
+
+    from .std_capture import TeeNoFile
+
+else:
+    import importlib
+
+    def __getattr__(name):
+        """
+            Import the submodule defining the package attribute `name` only on its first access,
+            so `from debug_tools import getLogger` does not import the `utilities` and the other
+            submodules not required for logging. See PEP 562 -- Module __getattr__ and __dir__.
+        """
+
+        if name in _lazy_attributes:
+            value = getattr( importlib.import_module( "." + _lazy_attributes[name], __name__ ), name )
+
+        elif name in _lazy_attributes.values():
+            value = importlib.import_module( "." + name, __name__ )
+
+        else:
+            raise AttributeError( "module '%s' has no attribute '%s'" % ( __name__, name ) )
+
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted( set( globals() ) | set( _lazy_attributes ) | set( _lazy_attributes.values() ) )
@@ -0,0 +1,404 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+####################### Licensing #######################################################
+#
+#   Copyright 2018 @ Evandro Coan
+#   Binary structured log sink with deferred formatting
+#
+#  Redistributions of source code must retain the above
+#  copyright notice, this list of conditions and the
+#  following disclaimer.
+#
+#  Redistributions in binary form must reproduce the above
+#  copyright notice, this list of conditions and the following
+#  disclaimer in the documentation and/or other materials
+#  provided with the distribution.
+#
+#  Neither the name Evandro Coan nor the names of any
+#  contributors may be used to endorse or promote products
+#  derived from this software without specific prior written
+#  permission.
+#
+#  This program is free software; you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the
+#  Free Software Foundation; either version 3 of the License, or ( at
+#  your option ) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+#  General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#########################################################################################
+#
+
+
+import sys
+import marshal
+import logging
+
+from .logger import SmartLogRecord
+from .logger import DebuggerFormatter
+from .logger import _format_attribute
+
+# Every file entry is a marshal dumped tuple, starting with one of these kinds. The records start
+# with `RECORD_ENTRY` plus their layout index, followed by their arguments and attributes values.
+HEADER_ENTRY = 0
+STRING_ENTRY = 1
+FORMATTER_ENTRY = 2
+LAYOUT_ENTRY = 3
+LITERAL_ENTRY = 4
+RECORD_ENTRY = 5
+
+BINARY_LOG_VERSION = 2
+MARSHAL_VERSION = 2
+
+# The record attributes which are written once on the strings table, instead of on every record
+_interned_attributes = frozenset( ( "name", "levelname", "pathname", "filename", "module",
+        "funcName", "threadName", "processName" ) )
+
+# The record attributes computed by the formatter, instead of being read from the record
+_formatted_attributes = frozenset( ( "message", "asctime" ) )
+
+# The record attributes read by the formatter besides the ones on its format, when they are set
+_optional_attributes = ( "exc_text", "stack_info" )
+
+try:
+    _string_types = ( str, unicode )
+    _primitive_types = frozenset( ( type( None ), bool, int, long, float, str, unicode ) )
+
+except NameError:
+    _string_types = str
+    _primitive_types = frozenset( ( type( None ), bool, int, float, str, bytes ) )
+
+# The formatter classes which produce the same output as a `logging.Formatter( fmt, datefmt )`
+_deferred_formatters = ( logging.Formatter, DebuggerFormatter )
+
+# Python 2 formatters have no `_style`, and they always use the `%` style
+_PercentStyle = getattr( logging, "PercentStyle", None )
+
+
+def _get_msecs(created):
+    """
+        Return the `msecs` of a record `created` at this time, as computed by `LogRecord` until
+        Python 3.12. The records with this `msecs` do not write it, as `read_binary_log()` computes it.
+    """
+    return ( created - int( created ) ) * 1000
+
+
+class BinaryLogHandler(logging.FileHandler):
+    """
+        A FileHandler which writes the raw record attributes, instead of the formatted record text.
+
+        The message template, its arguments, the timestamp and only the other record attributes
+        used by the formatter format, as the caller location, the debug level and the tick
+        difference, are written with `marshal`, and the formatting is deferred to
+        `read_binary_log()`, which renders exactly the text the record formatter would have
+        produced. The repetitive strings as the message templates, the logger name and the caller
+        location are written only once per file, on its strings table, and each record only
+        refers to its layout, i.e., its formatter, message template and attributes names.
+
+        Records formatted by something other than a plain `logging.Formatter` or a
+        `DebuggerFormatter`, or with arguments which are not primitive values, are written already
+        formatted.
+
+        @param `filename`     the path to the binary log file
+        @param `mode`         the file open mode, the binary flag `b` is added when missing
+        @param `max_strings`  the strings and layouts tables size limit, after it, the records
+                              with new strings or layouts are written already formatted
+    """
+    terminator = "\n"
+
+    def __init__(self, filename, mode='a', max_strings=65536, delay=False):
+        self.max_strings = max_strings
+        mode = mode if 'b' in mode else mode + 'b'
+        super( BinaryLogHandler, self ).__init__( filename, mode, delay=delay )
+
+    def _open(self):
+        """
+            Every time the file is opened, write a new header and restart all the tables.
+        """
+        self._strings = {}
+        self._layouts = {}
+        self._formatters = {}
+
+        stream = super( BinaryLogHandler, self )._open()
+        stream.write( marshal.dumps( ( HEADER_ENTRY, BINARY_LOG_VERSION, tuple( sys.version_info[:2] ) ), MARSHAL_VERSION ) )
+        return stream
+
+    def emit(self, record):
+
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+
+            formatter = getattr( record, "debugFormatter", None ) or self.formatter or logging._defaultFormatter
+
+            # Unwraps the `debug_tools.logger.RecordFormatter`
+            formatter = getattr( formatter, "formatter", formatter ) or logging._defaultFormatter
+            entries = []
+
+            if not self._defer_record( record, formatter, entries ):
+                entries.append( ( LITERAL_ENTRY, formatter.format( record ), self.terminator ) )
+
+            self.stream.write( b"".join( marshal.dumps( entry, MARSHAL_VERSION ) for entry in entries ) )
+            self.flush()
+
+        except Exception:
+            self.handleError( record )
+
+    def _defer_record(self, record, formatter, entries):
+        """
+            Append to `entries` the entries required to write the `record` without formatting it.
+            Return False if the record cannot have its formatting deferred, however, the new table
+            entries appended still need to be written.
+        """
+        formatter_layout = self._get_formatter( formatter, entries )
+
+        if formatter_layout is None:
+            return False
+
+        formatter_index, formatter_names = formatter_layout
+        terminator = self.terminator
+
+        args = record.args
+        primitive_types = _primitive_types
+
+        if isinstance( args, tuple ):
+
+            for value in args:
+
+                if type( value ) not in primitive_types:
+                    return False
+
+        elif isinstance( args, dict ):
+
+            for key, value in args.items():
+
+                if type( key ) not in primitive_types or type( value ) not in primitive_types:
+                    return False
+
+        elif args is not None:
+            return False
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = formatter.formatException( record.exc_info )
+
+        attributes = record.__dict__
+
+        # The `debug_tools.logger.CleanLogRecord` constant attributes are not on its `__dict__`
+        defaults = getattr( type( record ), "_attributes", None )
+
+        if defaults:
+            attributes = dict( defaults )
+            attributes.update( record.__dict__ )
+
+        names = tuple( name for name in formatter_names if name in attributes
+                and ( name != "msecs" or attributes[name] != _get_msecs( attributes["created"] ) ) ) \
+                + tuple( name for name in _optional_attributes if attributes.get( name ) )
+
+        values = [ attributes[name] for name in names ]
+
+        for value in values:
+
+            if type( value ) not in primitive_types:
+                return False
+
+        message = record.msg
+        message = message if isinstance( message, _string_types ) else str( message )
+        template = self._get_string( message, entries )
+
+        if template is None:
+            return False
+
+        # The tuple arguments are written flattened with the record values
+        args_count = len( args ) if isinstance( args, tuple ) else None
+        layout_key = ( formatter_index, template, args_count, names, terminator )
+        layout = self._layouts.get( layout_key )
+
+        if layout is None:
+
+            if len( self._layouts ) >= self.max_strings:
+                return False
+
+            interned = tuple( index for index, name in enumerate( names ) if name in _interned_attributes )
+            layout = ( len( self._layouts ), interned )
+
+            self._layouts[layout_key] = layout
+            entries.append( ( LAYOUT_ENTRY, layout[0], formatter_index, template, args_count, names, interned, terminator ) )
+
+        for index in layout[1]:
+
+            if values[index] is None:
+                continue
+
+            value = self._get_string( values[index], entries )
+
+            if value is None:
+                return False
+
+            values[index] = value
+
+        if args_count is None:
+            entries.append( ( RECORD_ENTRY + layout[0], args ) + tuple( values ) )
+
+        else:
+            entries.append( ( RECORD_ENTRY + layout[0], ) + args + tuple( values ) )
+
+        return True
+
+    def _get_formatter(self, formatter, entries):
+        """
+            Return the `formatter` index on the formatters table and the names of the record
+            attributes it uses, or None if its formatting cannot be deferred.
+        """
+        layout = self._formatters.get( formatter )
+
+        if layout is None:
+
+            style = getattr( formatter, "_style", None )
+
+            if type( formatter ) not in _deferred_formatters or style and type( style ) is not _PercentStyle:
+                return None
+
+            fmt = formatter._fmt
+            names = [ "created" ]
+
+            # `formatTime()` also uses the `msecs` when there is no `datefmt`
+            if formatter.usesTime():
+                names.append( "msecs" )
+
+            for match in _format_attribute.finditer( fmt ):
+                name = match.group( 1 )
+
+                if name and name not in _formatted_attributes and name not in names:
+                    names.append( name )
+
+            layout = ( len( self._formatters ), tuple( names ) )
+            self._formatters[formatter] = layout
+            entries.append( ( FORMATTER_ENTRY, layout[0], fmt, formatter.datefmt ) )
+
+        return layout
+
+    def _get_string(self, value, entries):
+
+        if not isinstance( value, _string_types ):
+            return None
+
+        index = self._strings.get( value )
+
+        if index is None:
+
+            if len( self._strings ) >= self.max_strings:
+                return None
+
+            index = len( self._strings )
+            self._strings[value] = index
+            entries.append( ( STRING_ENTRY, index, value ) )
+
+        return index
+
+
+def read_binary_log(filename):
+    """
+        Yield the text of every record written into the binary log file `filename`, including
+        their terminators, as a `logging.FileHandler` would have written them.
+    """
+    strings = {}
+    layouts = {}
+    formatters = {}
+
+    with open( filename, 'rb' ) as file:
+
+        while True:
+
+            try:
+                entry = marshal.load( file )
+
+            # The last entry may be truncated if the program crashed while writing it
+            except (EOFError, ValueError, TypeError):
+                break
+
+            kind = entry[0]
+
+            if kind >= RECORD_ENTRY:
+                formatter, message, args_count, names, interned, terminator, msecs = layouts[kind - RECORD_ENTRY]
+
+                if args_count is None:
+                    args = entry[1]
+                    values = list( entry[2:] )
+
+                else:
+                    args = entry[1:args_count + 1]
+                    values = list( entry[args_count + 1:] )
+
+                for index in interned:
+
+                    if values[index] is not None:
+                        values[index] = strings[values[index]]
+
+                record = SmartLogRecord.__new__( SmartLogRecord )
+                record.exc_text = None
+                record.stack_info = None
+                record.__dict__.update( zip( names, values ) )
+
+                if msecs:
+                    record.msecs = _get_msecs( record.created )
+
+                record.msg = message
+                record.args = args
+                record.exc_info = None
+
+                yield formatter.format( record ) + terminator
+
+            elif kind == STRING_ENTRY:
+                strings[entry[1]] = entry[2]
+
+            elif kind == LAYOUT_ENTRY:
+                _, index, formatter_index, template, args_count, names, interned, terminator = entry
+                msecs = "msecs" not in names and "created" in names
+
+                layouts[index] = ( formatters[formatter_index], strings[template], args_count,
+                        names, interned, terminator, msecs )
+
+            elif kind == FORMATTER_ENTRY:
+                formatters[entry[1]] = logging.Formatter( entry[2], entry[3] )
+
+            elif kind == LITERAL_ENTRY:
+                yield entry[1] + entry[2]
+
+            elif kind == HEADER_ENTRY:
+
+                if entry[1] != BINARY_LOG_VERSION:
+                    raise ValueError( "Error: The file `%s` binary log version %s is not supported!" % (
+                            filename, entry[1] ) )
+
+                strings.clear()
+                layouts.clear()
+                formatters.clear()
+
+
+def main(arguments):
+    """
+        Write the text of the binary log files passed on the command line to the standard output.
+    """
+
+    if not arguments:
+        sys.stderr.write( "Usage: python -m debug_tools.binary_log file.bin [file.bin ...]\n" )
+        return 1
+
+    for filename in arguments:
+
+        for text in read_binary_log( filename ):
+            sys.stdout.write( text )
+
+    sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit( main( sys.argv[1:] ) )
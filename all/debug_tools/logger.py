@@ -41,17 +41,23 @@
 
 import os
 import io
+import re
 import sys
+import time
+import random
 
 import timeit
-import datetime
-import platform
-
-import inspect
-import traceback
+import atexit
+import functools
+import weakref
+import threading
 
 import logging
-import logging.handlers
+
+from operator import attrgetter
+
+from collections import deque
+from collections import OrderedDict
 
 from logging import getLevelName
 from logging import Logger
@@ -68,29 +74,21 @@ from logging import _acquireLock
 from logging import _releaseLock
 
 
-try:
-    from concurrent_log_handler import ConcurrentRotatingFileHandler
-
-except( ImportError, ValueError ):
-    from logging import FileHandler
-
-    class ConcurrentRotatingFileHandler(FileHandler):
-        """
-            Fall back with the basic file logger when ConcurrentRotatingFileHandler is not available.
-        """
-
-        def __init__(self, output_file, maxBytes=0, backupCount=0):
-            super( ConcurrentRotatingFileHandler, self ).__init__( output_file )
-
-
+# The modules only required by some `setup()` options, as `platform`, `traceback`,
+# `concurrent_log_handler`, `json`, `ring_buffer` and the `sys.stderr/stdout` replacements, are
+# imported by the functions using them, so `getLogger()` users do not pay for their import time.
+#
 # Uncoment this temporarily to create update the `stdout_replacement.py` after changes
 # on `stderr_replacement.py`
 #
 # While developing, you can reload your changes to `create_stdout_handler` with:
 # from .utilities import _create_stdout_handler; _create_stdout_handler();
 
-from .stderr_replacement import stderr_replacement
-from .stdout_replacement import stdout_replacement
+try:
+    from contextvars import ContextVar
+
+except ImportError:
+    ContextVar = None
 
 changeable_setup_arguments = (
     "date",
@@ -128,6 +126,194 @@ else: #pragma: no cover
             return sys.exc_info()[level-1].tb_frame.f_back
 
 
+# The code objects file names already checked whether they are the logging module `_srcfile`
+_logging_frames = {}
+
+# The `lazy` arguments value before their function is called
+_not_evaluated = object()
+
+# The last second formatted by `format_timestamp()` for each date format and time converter
+_timestamps = {}
+
+# The `%(name)s` record attributes and the `%%` escapes on a format string
+_format_attribute = re.compile( r"%(?:\(([^)]*)\)|%)" )
+
+# The record attributes which require `findCaller()` to be called
+_caller_attributes = ( "funcName", "lineno", "pathname", "filename", "module" )
+
+
+# The message templates already formatted, bounded by `_message_templates_size`
+_message_templates = {}
+_message_templates_size = 4096
+
+# The `%` conversion specifiers: mapping key, flags, width, precision, length modifier and type
+_conversion_specifier = re.compile( r"%(\([^)]*\))?[-#0 +]*(\*|\d+)?(?:\.(\*|\d*))?[hlL]?(.?)", re.DOTALL )
+_conversion_types = frozenset( "diouxXeEfFgGcrsa" )
+
+
+class MessageTemplate(object):
+    """
+        A message template interned by `_SmartLogRecord.getMessage()`, with the count of positional
+        arguments its `%` conversion consumes, and how many times it was formatted.
+
+        The `arguments` count is None when the template cannot be formatted with positional
+        arguments, i.e., it uses mapping keys or it has invalid conversion specifiers.
+    """
+    __slots__ = ( "msg", "arguments", "hits" )
+
+    def __init__(self, msg):
+        self.msg = msg
+        self.hits = 0
+        self.arguments = self._count_arguments( msg )
+
+    @staticmethod
+    def _count_arguments(msg):
+        arguments = 0
+
+        if "%" not in msg:
+            return arguments
+
+        for specifier in _conversion_specifier.finditer( msg ):
+            key, width, precision, conversion = specifier.groups()
+
+            if conversion == "%":
+                continue
+
+            if key is not None or conversion not in _conversion_types:
+                return None
+
+            arguments += 1 + ( width == "*" ) + ( precision == "*" )
+
+        return arguments
+
+
+def get_message_templates():
+    """
+        Return a dictionary with the interned message templates and how many times each one was
+        formatted, for instrumentation.
+    """
+    return { msg: template.hits for msg, template in list( _message_templates.items() ) }
+
+
+def format_timestamp(datefmt, created, converter=time.localtime):
+    """
+        Return `time.strftime( datefmt, converter( created ) )`, formatting the same second only
+        once for all formatters sharing the same `datefmt`. The sub second part of the timestamp
+        is left for the caller, as the `%(msecs)` formatted by `Debugger._create_formatter()`.
+
+        @param `created` a `time.time()` timestamp, as the `LogRecord.created` attribute
+    """
+    second = int( created )
+    key = ( datefmt, converter )
+    cached_second, cached_timestamp = _timestamps.get( key, ( None, None ) )
+
+    if second == cached_second:
+        return cached_timestamp
+
+    cached_timestamp = time.strftime( datefmt, converter( created ) )
+    _timestamps[key] = ( second, cached_timestamp )
+    return cached_timestamp
+
+
+# The Debugger::_enabled_levels tables, shared by all loggers with the same `debug_level`
+_enabled_levels_tables = {}
+
+
+def _get_enabled_levels(debug_level):
+    """
+        Return the table telling whether each bitwise level from 0 until 127 is enabled by the
+        `debug_level`, for the Debugger::__call__() first lookup.
+
+        The negative levels from -128 until -1 read the table from its end, i.e., the level `-n`
+        reads the entry `128 - n`, which has the same lower 7 bits. They get the right answer only
+        while the `debug_level` has no other bits, therefore, the other debug levels share a table
+        enabling all levels, and their calls are decided by the bitwise test.
+    """
+
+    if not 0 <= debug_level < 128:
+        debug_level = -1
+
+    try:
+        return _enabled_levels_tables[debug_level]
+
+    except KeyError:
+
+        if debug_level < 0:
+            enabled_levels = ( True, ) * 128
+
+        else:
+            enabled_levels = tuple( debug_level & level != 0 for level in range( 128 ) )
+
+        _enabled_levels_tables[debug_level] = enabled_levels
+        return enabled_levels
+
+
+def _filters_use_caller(filters):
+    """
+        Return True if some of the `filters` may read the caller location of the records. Only the
+        FileHandlerContextFilter is known to not read it, as the DeduplicationFilter compares the
+        records call site, and the other filters can access any record attribute.
+    """
+
+    for record_filter in filters:
+
+        if type( record_filter ) is not FileHandlerContextFilter:
+            return True
+
+    return False
+
+
+def _formatter_uses_caller(formatter):
+    """
+        Return True if the `formatter` uses some of the caller location record attributes. Custom
+        formatter classes are assumed to use them, as they can access any record attribute.
+    """
+    if formatter is None:
+        return False
+
+    try:
+        return formatter._uses_caller
+
+    except AttributeError:
+
+        if type( formatter ) is logging.Formatter:
+            fmt = formatter._fmt or ""
+            uses_caller = any( attribute in fmt for attribute in _caller_attributes )
+
+        else:
+            uses_caller = True
+
+        formatter._uses_caller = uses_caller
+        return uses_caller
+
+
+def _context_storage(name):
+    """
+        Return the `get( default )` and `set( value )` functions of a storage local to the current
+        thread and asyncio task, so concurrent log calls do not overwrite each other values without
+        locking, as the last tick and the current span. Before Python 3.7 there is no
+        `contextvars`, and the storage is only local to the current thread.
+    """
+
+    if ContextVar:
+        variable = ContextVar( name )
+        return variable.get, variable.set
+
+    local = threading.local()
+
+    def get(default):
+        return getattr( local, 'value', default )
+
+    def set(value):
+        local.value = value
+
+    return get, set
+
+
+# The innermost `Debugger.span()` entered by the current thread or asyncio task
+_get_current_span, _set_current_span = _context_storage( "debug_tools.current_span" )
+
+
 class Debugger(Logger):
     """
         https://docs.python.org/2.6/library/logging.html
@@ -140,7 +326,13 @@ class Debugger(Logger):
     """
     _debugme = False
     _file_context_filter = None
+
+    # Incremented when some logger handlers, `propagate`, parent or forced debug level changes,
+    # invalidating all cached `active` loggers and `getLogger()` calls
+    _hierarchy_generation = 0
+
     _has_file_context_filter = False
+    _override_formatters_size = 32
 
     def __init__(self, logger_name, logger_level=None):
         """
@@ -151,10 +343,14 @@ class Debugger(Logger):
         super( Debugger, self ).__init__( logger_name, logger_level or "DEBUG" )
 
         self._file = None
+        self._ring = None
         self._stream = None
+        self._active_cache = ( None, None )
 
-        # Initialize the first last tick as the current tick
+        # Initialize the first last tick as the current tick. Each thread and asyncio task also
+        # keeps its own last tick, starting from this global one, see Debugger::_log()
         self._last_tick = timeit.default_timer()
+        self._get_context_tick, self._set_context_tick = _context_storage( "%s.last_tick" % logger_name )
 
         # Forces this debug_level into all children
         self._force_debug = None
@@ -163,8 +359,12 @@ class Debugger(Logger):
         # Enable debug messages: (bitwise)
         # 0 - Disabled debugging
         # 1 - Errors messages
-        self._frame_level = 3
-        self._debugger_level = 127
+        self._frame_level = 2
+        self._call_sites = {}
+        self._span_histograms = {}
+        self._bitwise_loggers = {}
+        self._debugger_level = None
+        self.debug_level = 127
         self._reset()
 
     @property
@@ -183,13 +383,24 @@ class Debugger(Logger):
             active handlers.
 
             The root logger is not returned, unless it is already setup with handlers.
+
+            The result is cached until the `_hierarchy_generation` changes, i.e., until some
+            handler is added or removed, some `propagate` is set or some logger is created.
         """
+        generation = Debugger._hierarchy_generation
+        cached_generation, active = self._active_cache
+
+        if cached_generation == generation:
+            return active
+
         current = self
+        active = None
 
         while current:
 
             if current.handlers:
-                return current
+                active = current
+                break
 
             if not current.propagate:
                 break
@@ -197,7 +408,17 @@ class Debugger(Logger):
             else:
                 current = current.parent
 
-        return None
+        self._active_cache = ( generation, active )
+        return active
+
+    @property
+    def propagate(self):
+        return self._propagate
+
+    @propagate.setter
+    def propagate(self, propagate):
+        self._propagate = propagate
+        Debugger._hierarchy_generation += 1
 
     @property
     def debug_level(self):
@@ -213,7 +434,15 @@ class Debugger(Logger):
         """
 
         if isinstance( debug_level, int ):
+
+            if debug_level == self._debugger_level:
+                return
+
             self._debugger_level = debug_level
+            self._enabled_levels = _get_enabled_levels( debug_level )
+
+            for bitwise_logger in self._bitwise_loggers.values():
+                bitwise_logger._update()
 
         else:
             raise ValueError( "Error: The debug_level `%s` must be an integer!" % debug_level )
@@ -276,6 +505,7 @@ class Debugger(Logger):
             Prints the stack trace (traceback) until the current function call.
         """
         kwargs['debug_level'] = 1
+        import traceback
         self._log( DEBUG, "traceback.format_stack():\n%s\n\n", "".join( traceback.format_stack() ) )
 
     def reset(self):
@@ -290,8 +520,11 @@ class Debugger(Logger):
 
     def _reset(self):
         self._arguments = self._formatter_arguments()
+        self._override_formatters = OrderedDict()
         self.full_formatter = self._setup_formatter( self._arguments )
+        self._setup_clean_formatters()
 
+    def _setup_clean_formatters(self):
         self.clean_formatter = logging.Formatter( "", "" )
         self.setup_basic( function=False, tick=False )
 
@@ -326,6 +559,16 @@ class Debugger(Logger):
             "fast": False,
             "stream": None,
             "trimname": 0,
+            "asynchronous": False,
+            "queue_size": 10000,
+            "overflow": "block",
+            "buffer": 0,
+            "ring": None,
+            "ring_size": 1,
+            "binary": False,
+            "json": False,
+            "dedup": False,
+            "global_tick": False,
         }
 
     def newline(self, debug_level=1, count=1):
@@ -349,8 +592,23 @@ class Debugger(Logger):
             Log to the current active handlers its message based on the bitwise `self._debugger_level`
             value. Note, differently from the standard logging level, each logger object has its own
             bitwise logging level, instead of all sharing the main `level`.
+
+            The bitwise levels from -128 until 127 are first checked against the `_enabled_levels`
+            table, which is selected every time the `debug_level` changes. Then, disabled calls
+            as `log(4, "message")` are discarded with a single indexed lookup. The other levels
+            only use the bitwise test, see `_get_enabled_levels()`.
+
+            The keyword arguments `sample`, `every` and `per_second` limit how many records are
+            logged by each call site, i.e., source file and line, see `_is_suppressed()`:
+                log( 2, "message", sample=0.01 ) logs about 1% of the records
+                log( 2, "message", every=1000 ) logs the 1st, 1001st, 2001st records, etc
+                log( 2, "message", per_second=10 ) logs at most 10 records each second
         """
 
+        try:
+            if not self._enabled_levels[debug_level] and msg is not EMPTY_KWARG: return
+        except (TypeError, IndexError): pass
+
         if type( debug_level ) is int:
 
             if msg is EMPTY_KWARG:
@@ -374,31 +632,44 @@ class Debugger(Logger):
                 else:
                     self._log( DEBUG, debug_level, (msg,) + args, **kwargs )
 
-    def _fast_clean(self, debug_level=1, msg=EMPTY_KWARG, *args, **kwargs):
+    def bitwise(self, debug_level):
+        """
+            Return a callable which logs messages with the bitwise `debug_level`, as `log(4, msg)`.
 
-        if self._debugger_level & debug_level != 0:
-            other = self.active or self
+            It is rebound to a no-op function while the `debug_level` is disabled for this logger,
+            and rebound again to a real emitter when it gets enabled by `debug_level`, `force` or
+            `fix_children()`. Then, hot loops can cache it and pay nothing for disabled levels:
 
-            old_formatters = {}
-            _acquireLock()
-            try:
-                for handler in other.handlers:
-                    old_formatters[handler] = handler.formatter
-                    handler.formatter = self.clean_formatter
+                log4 = log.bitwise( 4 )
+                for item in items: log4( "processing %s", item )
+        """
+        try:
+            return self._bitwise_loggers[debug_level]
 
-            finally:
-                _releaseLock()
+        except KeyError:
+
+            if not isinstance( debug_level, int ):
+                raise ValueError( "Error: The debug_level `%s` must be an integer!" % debug_level )
+
+            bitwise_logger = self._bitwise_loggers[debug_level] = BitwiseLogger( self, debug_level )
+            return bitwise_logger
 
+    def _fast_clean(self, debug_level=1, msg=EMPTY_KWARG, *args, **kwargs):
+
+        if self._debugger_level & debug_level != 0:
             kwargs['debug_level'] = debug_level
             self._log_clean( msg, args, kwargs )
 
-            for handler, formatter in old_formatters.items():
-                handler.formatter = formatter
-
     def clean(self, debug_level=1, msg=EMPTY_KWARG, *args, **kwargs):
         """
             Prints a message without the time prefix as `[plugin_name.py] 11:13:51:0582059`
 
+            The `clean_formatter` is selected by the log record itself, and it formats the record
+            on all handlers receiving it, including the ones added by the user with their own
+            formatter, see Debugger::callHandlers().
+
+            The keyword arguments `sample`, `every` and `per_second` work as on `__call__()`.
+
             How to insert newline in python logging?
             https://stackoverflow.com/questions/20111758/how-to-insert-newline-in-python-logging
         """
@@ -408,106 +679,31 @@ class Debugger(Logger):
             if msg is EMPTY_KWARG:
 
                 if self._debugger_level & 1 != 0:
-                    other = self.active or self
-
-                    old_formatters = {}
-                    _acquireLock()
-                    try:
-                        for handler in other.handlers:
-                            old_formatters[handler] = handler.formatter
-                            handler.formatter = self.clean_formatter
-
-                    finally:
-                        _releaseLock()
-
                     kwargs['debug_level'] = 1
                     self._log_clean( debug_level, args, kwargs )
 
-                    for handler, formatter in old_formatters.items():
-                        handler.formatter = formatter
-
             elif self._debugger_level & debug_level != 0:
-                other = self.active or self
-
-                old_formatters = {}
-                _acquireLock()
-                try:
-                    for handler in other.handlers:
-                        old_formatters[handler] = handler.formatter
-                        handler.formatter = self.clean_formatter
-
-                finally:
-                    _releaseLock()
-
                 kwargs['debug_level'] = debug_level
                 self._log_clean( msg, args, kwargs )
 
-                for handler, formatter in old_formatters.items():
-                    handler.formatter = formatter
-
         else:
 
             if self._debugger_level & 1 != 0:
+                kwargs['debug_level'] = 1
 
                 if msg is EMPTY_KWARG:
-                    other = self.active or self
-
-                    old_formatters = {}
-                    _acquireLock()
-                    try:
-                        for handler in other.handlers:
-                            old_formatters[handler] = handler.formatter
-                            handler.formatter = self.clean_formatter
-
-                    finally:
-                        _releaseLock()
-
-                    kwargs['debug_level'] = 1
                     self._log_clean( debug_level, args, kwargs )
 
-                    for handler, formatter in old_formatters.items():
-                        handler.formatter = formatter
-
                 else:
-                    other = self.active or self
-
-                    old_formatters = {}
-                    _acquireLock()
-                    try:
-                        for handler in other.handlers:
-                            old_formatters[handler] = handler.formatter
-                            handler.formatter = self.clean_formatter
-
-                    finally:
-                        _releaseLock()
-
-                    kwargs['debug_level'] = 1
                     self._log_clean( debug_level, (msg,) + args, kwargs )
 
-                    for handler, formatter in old_formatters.items():
-                        handler.formatter = formatter
-
     def _fast_basic(self, debug_level=1, msg=EMPTY_KWARG, *args, **kwargs):
 
         if self._debugger_level & debug_level != 0:
-            other = self.active or self
-
-            old_formatters = {}
-            _acquireLock()
-            try:
-                for handler in other.handlers:
-                    old_formatters[handler] = handler.formatter
-                    handler.formatter = self.basic_formatter
-
-            finally:
-                _releaseLock()
-
             kwargs['debug_level'] = debug_level
+            kwargs['_formatter'] = self.basic_formatter
             self._log( DEBUG, msg, args, **kwargs )
 
-            for handler, formatter in old_formatters.items():
-                handler.formatter = formatter
-
     def basic(self, debug_level=1, msg=EMPTY_KWARG, *args, **kwargs):
         """
             Prints the bitwise logging message with the standard basic formatter, which uses by
@@ -523,85 +719,27 @@ class Debugger(Logger):
             if msg is EMPTY_KWARG:
 
                 if self._debugger_level & 1 != 0:
-                    other = self.active or self
-
-                    old_formatters = {}
-                    _acquireLock()
-                    try:
-                        for handler in other.handlers:
-                            old_formatters[handler] = handler.formatter
-                            handler.formatter = self.basic_formatter
-
-                    finally:
-                        _releaseLock()
-
                     kwargs['debug_level'] = 1
+                    kwargs['_formatter'] = self.basic_formatter
                     self._log( DEBUG, debug_level, args, **kwargs )
 
-                    for handler, formatter in old_formatters.items():
-                        handler.formatter = formatter
-
             elif self._debugger_level & debug_level != 0:
-                other = self.active or self
-
-                old_formatters = {}
-                _acquireLock()
-                try:
-                    for handler in other.handlers:
-                        old_formatters[handler] = handler.formatter
-                        handler.formatter = self.basic_formatter
-
-                finally:
-                    _releaseLock()
-
                 kwargs['debug_level'] = debug_level
+                kwargs['_formatter'] = self.basic_formatter
                 self._log( DEBUG, msg, args, **kwargs )
 
-                for handler, formatter in old_formatters.items():
-                    handler.formatter = formatter
-
         else:
 
             if self._debugger_level & 1 != 0:
+                kwargs['debug_level'] = 1
+                kwargs['_formatter'] = self.basic_formatter
 
                 if msg is EMPTY_KWARG:
-                    other = self.active or self
-
-                    old_formatters = {}
-                    _acquireLock()
-                    try:
-                        for handler in other.handlers:
-                            old_formatters[handler] = handler.formatter
-                            handler.formatter = self.basic_formatter
-
-                    finally:
-                        _releaseLock()
-
-                    kwargs['debug_level'] = 1
                     self._log( DEBUG, debug_level, args, **kwargs )
 
-                    for handler, formatter in old_formatters.items():
-                        handler.formatter = formatter
-
                 else:
-                    other = self.active or self
-
-                    old_formatters = {}
-                    _acquireLock()
-                    try:
-                        for handler in other.handlers:
-                            old_formatters[handler] = handler.formatter
-                            handler.formatter = self.basic_formatter
-
-                    finally:
-                        _releaseLock()
-
-                    kwargs['debug_level'] = 1
                     self._log( DEBUG, debug_level, (msg,) + args, **kwargs )
 
-                    for handler, formatter in old_formatters.items():
-                        handler.formatter = formatter
-
     _old_clean = clean
     _old_basic = basic
 
@@ -634,6 +772,8 @@ class Debugger(Logger):
             @param `stderr` if True, it will enable the logging hook on the sys.stderr.
             @param `stdout` if True, it will enable the logging hook on the sys.stdout.
         """
+        from .stderr_replacement import stderr_replacement
+        from .stdout_replacement import stdout_replacement
         _acquireLock()
 
         try:
@@ -658,15 +798,26 @@ class Debugger(Logger):
         finally:
             _releaseLock()
 
-    def _disable(self, stream=False, file=False):
+    def _disable(self, stream=False, file=False, ring=False):
         """
             Delete all automatically setup handlers created by the automatic `setup()`.
         """
         is_successful = False
 
+        if ring and self._ring:
+            self.removeHandler( self._ring )
+            self._ring.close()
+
+            is_successful = True
+            self._ring = None
+
         if stream and self._stream:
             self.removeHandler( self._stream )
 
+            # Stop its writer thread, the standard StreamHandler does not close its stream
+            if isinstance( self._stream, AsynchronousHandler ):
+                self._stream.close()
+
             is_successful = True
             self._stream = None
 
@@ -686,6 +837,9 @@ class Debugger(Logger):
         """
             Configure the force debug level feature.
         """
+        if force_debug is not None:
+            Debugger._hierarchy_generation += 1
+
         if force_debug:
             active._force_debug = force_debug
             self._debug_level = force_debug
@@ -746,7 +900,8 @@ class Debugger(Logger):
             @param `name`       if True, add to the `full_formatter` the logger name.
             @param `time`       if True, add to the `full_formatter` the time on the format `%H:%M:%S:milliseconds.microseconds`.
             @param `msecs`      if True, add to the `full_formatter` the current milliseconds on the format ddd,ddddd.
-            @param `tick`       if True, add to the `full_formatter` the time.perf_counter() difference from the last call.
+            @param `tick`       if True, add to the `full_formatter` the time.perf_counter() difference from the last call
+                                on the current thread or asyncio task.
             @param `separator`  if True, add to the `full_formatter` the a ` - ` to the end of the log record header.
             @param `formatter`  if not None, replace this `full_formatter` by the logging.Formatter() provided.
 
@@ -787,6 +942,51 @@ class Debugger(Logger):
             @param `trimname` (default 0), Remove these nth characters from the logger name
                                 while creating the log record to print on the screen. Useful to keep
                                 several loggers grouped together but hide their parent.
+
+            @param `asynchronous` if True (default False), put a bounded queue in front of the file
+                                or stream handler, so the records are formatted and written by a
+                                background thread, instead of the thread calling the logger. Use
+                                `flush()` to wait for the queued records to be written.
+
+            @param `queue_size` (default 10000), the maximum number of records waiting to be
+                                written when `asynchronous` is enabled.
+
+            @param `overflow`   (default `block`), what to do with a new record when the
+                                `asynchronous` queue is full: `block` waits for the writer thread,
+                                `drop-oldest` discards the oldest queued record and `drop-new`
+                                discards the new record. See AsynchronousHandler::dropped.
+
+            @param `buffer`     if non zero (default 0), creates a BufferedFileHandler instead of
+                                FileHandler when creating a log file by the `file` option, which
+                                coalesces up to this number of characters of formatted records
+                                before writing them to the file. The buffer is also written after
+                                one second, by records with level WARNING or above and on exit.
+                                It cannot be used together with `rotation`, raising ValueError.
+
+            @param `ring`       if not None (default None), a path to a memory mapped ring buffer
+                                file, which keeps the last `ring_size` Mega Bytes of records,
+                                alongside the file or stream handler. It survives crashes and can be
+                                read back with debug_tools::ring_buffer::read_ring_buffer().
+
+            @param `ring_size`  (default 1), the `ring` buffer file size in Mega Bytes.
+
+            @param `binary`     if True (default False), the `file` is written with the raw records
+                                attributes, deferring their formatting until the file is read with
+                                `python -m debug_tools.binary_log file` or with
+                                debug_tools::binary_log::read_binary_log().
+
+            @param `json`       if True (default False), write one JSON object per line for each
+                                record, with its name, debugLevel, levelname, funcName, lineno,
+                                created, tickDifference and message attributes. The `clean()` and
+                                `basic()` records are also written as JSON objects.
+
+            @param `dedup`      if True or a number of seconds (default False), consecutive records
+                                with the same message from the same call site are written only
+                                once, followed by a "last message repeated N times" record, when a
+                                different record arrives or after `dedup` seconds (True is 1).
+
+            @param `global_tick` if True (default False), the `tick` also shows the difference from
+                                the last call on any thread, as the `globalTickDifference` attribute.
         """
         self._setup( file=file, mode=mode, delete=delete, date=date, levels=levels,
                 function=function, name=name, time=time, msecs=msecs, tick=tick,
@@ -821,6 +1021,7 @@ class Debugger(Logger):
                 if value != arguments[kwarg]:
                     has_changes = True
                     arguments[kwarg] = value
+                    logger._override_formatters.clear()
 
                     if kwarg == 'trimname':
                         self.trimname = len( value ) + 1
@@ -834,6 +1035,13 @@ class Debugger(Logger):
                 logger.fix_children( lambda logger: logger.removeHandlers() )
 
             logger.full_formatter = logger._setup_formatter( logger._arguments )
+
+            if logger._arguments['json']:
+                logger.clean_formatter = logger.basic_formatter = logger.full_formatter
+
+            elif isinstance( logger.clean_formatter, JsonFormatter ):
+                logger._setup_clean_formatters()
+
             logger._setup_log_handlers()
 
     def _setup_log_handlers(self):
@@ -846,7 +1054,7 @@ class Debugger(Logger):
         if arguments['file']:
             output_file = self.get_debug_file_path( arguments['file'] )
 
-            sys.stderr.write( "".join( self._get_time_prefix( datetime.datetime.now() ) )
+            sys.stderr.write( "".join( self._get_time_prefix( time.time() ) )
                     + "Logging to the file %s\n" % output_file )
 
             self._create_file( output_file, arguments['rotation'], arguments['mode'] )
@@ -858,7 +1066,9 @@ class Debugger(Logger):
 
             try:
                 self._stream = logging.StreamHandler( arguments['stream'] )
-                self._stream.formatter = self.full_formatter
+                self._stream.formatter = RecordFormatter( self.full_formatter )
+                self._stream = self._asynchronous_handler( self._stream )
+                self._deduplicate_handler( self._stream )
 
             except Exception:
                 self.exception( "Could not create the stream handler" )
@@ -869,7 +1079,20 @@ class Debugger(Logger):
             self.addHandler( self._stream )
             self._disable( file=arguments['delete'] )
 
+        self._disable( ring=True )
+
+        if arguments['ring']:
+            from .ring_buffer import RingBufferHandler
+            self._ring = RingBufferHandler( self.get_debug_file_path( arguments['ring'] ), arguments['ring_size'] )
+            self._ring.formatter = RecordFormatter( self.full_formatter )
+            self.addHandler( self._ring )
+
     def _create_file(self, output_file, rotation, mode, clear=False, delete=False):
+
+        if rotation > 0 and self._arguments['buffer']:
+            raise ValueError( "The buffer argument `%s` is not supported with the rotation argument `%s`."
+                    % ( self._arguments['buffer'], rotation ) )
+
         backup_count = mode
         mode = 'w' if clear else mode
 
@@ -888,19 +1111,61 @@ class Debugger(Logger):
             rotation = rotation * 1024 * 1024
 
             backup_count = abs( backup_count ) if isinstance( backup_count, int ) else 2
-            _file = ConcurrentRotatingFileHandler( output_file, maxBytes=rotation, backupCount=backup_count )
+            _file = _rotating_file_handler( output_file, rotation, backup_count )
 
         else:
 
             if not isinstance( mode, str ):
                 raise ValueError( "The mode argument `%s` must be instance of string." % mode )
 
-            _file = logging.FileHandler( output_file, mode )
+            if self._arguments['binary']:
+                # Imported here, so `python -m debug_tools.binary_log` does not import it twice
+                from .binary_log import BinaryLogHandler
+                _file = BinaryLogHandler( output_file, mode )
+
+            elif self._arguments['buffer']:
+                _file = BufferedFileHandler( output_file, mode, self._arguments['buffer'] )
+
+            else:
+                _file = logging.FileHandler( output_file, mode )
+
+        _file.formatter = RecordFormatter( self.full_formatter )
+        _file = self._asynchronous_handler( _file )
+        self._deduplicate_handler( _file )
 
-        _file.formatter = self.full_formatter
         self._file = _file
         self.addHandler( _file )
 
+    def _asynchronous_handler(self, handler):
+        """
+            Put the `handler` behind an `AsynchronousHandler` queue, if `setup(asynchronous=True)`.
+        """
+        arguments = self._arguments
+
+        if arguments['asynchronous']:
+            return AsynchronousHandler( handler, arguments['queue_size'], arguments['overflow'] )
+
+        return handler
+
+    def _deduplicate_handler(self, handler):
+        """
+            Add a `DeduplicationFilter` to the `handler`, if `setup(dedup=True)`.
+        """
+        dedup = self._arguments['dedup']
+
+        if dedup:
+            handler.addFilter( DeduplicationFilter( handler, float( dedup ) ) )
+
+    def flush(self):
+        """
+            Flush all handlers of the active logger, waiting for the `asynchronous` queued records
+            to be written.
+        """
+        active = self.active or self
+
+        for handler in active.handlers:
+            handler.flush()
+
     def _setup_fast_loggers(self):
 
         if self._arguments['fast']:
@@ -930,81 +1195,282 @@ class Debugger(Logger):
 
     if is_python2:
 
-        def _log(self, level, msg, args, exc_info=None, extra={}, stack_info=False, debug_level=0, **kwargs):
-            self._current_tick = timeit.default_timer()
+        # Python 2.7.14 Logger._log(), only changing the `findCaller()` call to be skipped when no
+        # handler formatter is showing the caller location, see Debugger::_needs_caller().
+        def _log(self, level, msg, args, exc_info=None, extra=None, stack_info=False, debug_level=0, _formatter=None,
+                sample=None, every=None, per_second=None, **kwargs):
 
-            debug_level = "(%d)" % debug_level if debug_level else ""
-            extra.update( {"debugLevel": debug_level, "tickDifference": self._current_tick - self._last_tick} )
+            # The rejected records do not pay for `findCaller()`, see Debugger::_is_suppressed()
+            if sample is not None or every or per_second:
+                caller = sys._getframe( 2 )
 
-            if any( setup_arg in kwargs for setup_arg in changeable_setup_arguments ):
-                other = self.active or self
-                new_arguments = dict( self._arguments )
+                if self._is_suppressed( ( caller.f_code.co_filename, caller.f_lineno ), sample, every, per_second ):
+                    return
 
-                for setup_arg in changeable_setup_arguments:
-                    new_arguments[setup_arg] = kwargs.pop( setup_arg, new_arguments.get( setup_arg ) )
+            current_tick = timeit.default_timer()
 
-                new_formatter = self._create_formatter( new_arguments )
+            if any( setup_arg in kwargs for setup_arg in changeable_setup_arguments ):
+                _formatter = self._override_formatter( kwargs )
 
-                old_formatters = {}
-                _acquireLock()
+            if _srcfile and self._needs_caller( _formatter ):
+                #IronPython doesn't track Python frames, so findCaller raises an
+                #exception on some versions of IronPython. We trap it here so that
+                #IronPython can use logging.
                 try:
-                    for handler in other.handlers:
-                        old_formatters[handler] = handler.formatter
-                        handler.formatter = new_formatter
-
-                finally:
-                    _releaseLock()
-
-                super( Debugger, self )._log( level, msg, args, exc_info, extra )
-                self._last_tick = self._current_tick
-
-                for handler, formatter in old_formatters.items():
-                    handler.formatter = formatter
-
+                    fn, lno, func = self.findCaller()
+                except ValueError:
+                    fn, lno, func = "(unknown file)", 0, "(unknown function)"
             else:
-                super( Debugger, self )._log( level, msg, args, exc_info, extra )
-                self._last_tick = self._current_tick
+                fn, lno, func = "(unknown file)", 0, "(unknown function)"
+            if exc_info:
+                if not isinstance(exc_info, tuple):
+                    exc_info = sys.exc_info()
+            record = self.makeRecord(self.name, level, fn, lno, msg, args, exc_info, func, extra)
+            record.debugLevel = "(%d)" % debug_level if debug_level else ""
+            record.tickDifference = current_tick - self._get_context_tick( self._last_tick )
+            record.globalTickDifference = current_tick - self._last_tick
+            if _formatter: record.debugFormatter = _formatter
+            self.handle(record)
+            self._set_context_tick( current_tick )
+            self._last_tick = current_tick
 
     else:
 
-        def _log(self, level, msg, args, exc_info=None, extra={}, stack_info=False, debug_level=0, **kwargs):
-            self._current_tick = timeit.default_timer()
-            if is_less_than_python_38 and "stacklevel" in kwargs: kwargs.pop( "stacklevel" )
+        # Python 3.8.0 Logger._log(), only changing the `findCaller()` call to be skipped when no
+        # handler formatter is showing the caller location, see Debugger::_needs_caller().
+        def _log(self, level, msg, args, exc_info=None, extra=None, stack_info=False, stacklevel=1, debug_level=0, _formatter=None,
+                sample=None, every=None, per_second=None, **kwargs):
 
-            debug_level = "(%d)" % debug_level if debug_level else ""
-            extra.update( {"debugLevel": debug_level, "tickDifference": self._current_tick - self._last_tick} )
+            # The rejected records do not pay for `findCaller()`, see Debugger::_is_suppressed()
+            if sample is not None or every or per_second:
+                caller = sys._getframe( 2 )
 
-            if any( setup_arg in kwargs for setup_arg in changeable_setup_arguments ):
-                other = self.active or self
-                new_arguments = dict( self._arguments )
+                if self._is_suppressed( ( caller.f_code.co_filename, caller.f_lineno ), sample, every, per_second ):
+                    return
 
-                for setup_arg in changeable_setup_arguments:
-                    new_arguments[setup_arg] = kwargs.pop( setup_arg, new_arguments.get( setup_arg ) )
+            current_tick = timeit.default_timer()
 
-                new_formatter = self._create_formatter( new_arguments )
+            if any( setup_arg in kwargs for setup_arg in changeable_setup_arguments ):
+                _formatter = self._override_formatter( kwargs )
 
-                old_formatters = {}
-                _acquireLock()
-                try:
-                    for handler in other.handlers:
-                        old_formatters[handler] = handler.formatter
-                        handler.formatter = new_formatter
+            if kwargs:
+                raise TypeError( "_log() got an unexpected keyword argument '%s'" % next( iter( kwargs ) ) )
 
-                finally:
-                    _releaseLock()
+            sinfo = None
+            if _srcfile and ( stack_info or self._needs_caller( _formatter ) ):
+                #IronPython doesn't track Python frames, so findCaller raises an
+                #exception on some versions of IronPython. We trap it here so that
+                #IronPython can use logging.
+                try:
+                    fn, lno, func, sinfo = self.findCaller(stack_info, stacklevel)
+                except ValueError: # pragma: no cover
+                    fn, lno, func = "(unknown file)", 0, "(unknown function)"
+            else:
+                fn, lno, func = "(unknown file)", 0, "(unknown function)"
+            if exc_info:
+                if isinstance(exc_info, BaseException):
+                    exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+                elif not isinstance(exc_info, tuple):
+                    exc_info = sys.exc_info()
+            record = self.makeRecord(self.name, level, fn, lno, msg, args,
+                                     exc_info, func, extra, sinfo)
+            record.debugLevel = "(%d)" % debug_level if debug_level else ""
+            record.tickDifference = current_tick - self._get_context_tick( self._last_tick )
+            record.globalTickDifference = current_tick - self._last_tick
+            if _formatter: record.debugFormatter = _formatter
+            self.handle(record)
+            self._set_context_tick( current_tick )
+            self._last_tick = current_tick
+
+    def _is_suppressed(self, call_site, sample, every, per_second):
+        """
+            Return True if the record from the `call_site` is rejected by the `log()` arguments.
+            It is checked before anything else is done for the record, as the call site is only
+            the caller frame file name and line, instead of the `findCaller()` result:
+
+            @param `sample`     the probability from 0.0 to 1.0 of logging each record
+            @param `every`      only log every `every` records, starting by the first one
+            @param `per_second` the maximum count of records logged each second
+        """
+        sites = self._call_sites
+        site = sites.get( call_site )
+
+        if site is None:
+            site = sites.setdefault( call_site, CallSite() )
+
+        calls = site.calls
+        site.calls = calls + 1
+
+        if every and calls % every \
+                or sample is not None and random.random() >= sample:
+            site.suppressed += 1
+            return True
+
+        if per_second:
+            second = int( timeit.default_timer() )
+
+            if second != site.second:
+                site.second = second
+                site.second_records = 0
+
+            if site.second_records >= per_second:
+                site.suppressed += 1
+                return True
 
-                super()._log( level, msg, args, exc_info, extra, stack_info, **kwargs )
-                self._last_tick = self._current_tick
+            site.second_records += 1
 
-                for handler, formatter in old_formatters.items():
-                    handler.formatter = formatter
+        return False
 
-            else:
-                super()._log( level, msg, args, exc_info, extra, stack_info, **kwargs )
-                self._last_tick = self._current_tick
+    def suppressed_records(self):
+        """
+            Return a dictionary with the count of records suppressed by the `sample`, `every` and
+            `per_second` arguments, for each `( filename, lineno )` call site.
+        """
+        return { call_site: site.suppressed for call_site, site in list( self._call_sites.items() ) }
+
+    def span(self, debug_level, name):
+        """
+            Return a context manager measuring the time spent inside it with `timeit.default_timer`,
+            which logs a single record as `db query took 1.23e-03 seconds` on its exit:
+
+                with log.span( 1, "db query" ):
+                    cursor.execute( query )
+
+            Spans entered inside other spans by the same thread or asyncio task are named after
+            their parents, as `request/db query`. Their durations are also counted by name, see
+            `span_histograms()`.
+
+            While the `debug_level` is disabled, a no-op context manager is returned, and nothing
+            is measured or logged.
+        """
+
+        if self._debugger_level & debug_level == 0:
+            return disabled_span
+
+        return Span( self, debug_level, name )
+
+    def timed(self, debug_level=1, name=None):
+        """
+            Return a decorator measuring each call of the decorated function with `span()`:
+
+                @log.timed( 2 )
+                def query(): pass
+
+            @param `name` the span name, by default the decorated function name
+        """
+
+        def decorator(function):
+            span_name = name or function.__name__
+
+            @functools.wraps( function )
+            def wrapper(*args, **kwargs):
+
+                if self._debugger_level & debug_level == 0:
+                    return function( *args, **kwargs )
+
+                # The `stacklevel` makes the record point to the decorated function caller
+                with Span( self, debug_level, span_name, stacklevel=2 ):
+                    return function( *args, **kwargs )
+
+            return wrapper
+
+        return decorator
+
+    def span_histograms(self):
+        """
+            Return a dictionary with the `SpanHistogram` of the durations for each span name.
+        """
+        return dict( list( self._span_histograms.items() ) )
+
+    def dump_span_histograms(self, debug_level=1):
+        """
+            Log with `clean()` one line for each span name with its durations histogram.
+        """
+
+        for name, histogram in sorted( self.span_histograms().items() ):
+            self.clean( debug_level, "%s %s", name, histogram )
+
+    def _override_formatter(self, kwargs):
+        """
+            Return the formatter for the per call formatting arguments as `log(1, "x", time=False)`.
+
+            The most recently used formatters are cached by their formatting arguments values on
+            `_override_formatters`, until `setup()` or `reset()` change this logger `_arguments`.
+        """
+        overrides = tuple( kwargs.pop( setup_arg, EMPTY_KWARG ) for setup_arg in changeable_setup_arguments )
+        formatters = self._override_formatters
+
+        try:
+            formatter = formatters.pop( overrides )
+
+        except KeyError:
+            new_arguments = dict( self._arguments )
+
+            for setup_arg, value in zip( changeable_setup_arguments, overrides ):
+                if value is not EMPTY_KWARG: new_arguments[setup_arg] = value
+
+            formatter = self._create_formatter( new_arguments )
+
+            if len( formatters ) >= self._override_formatters_size:
+                formatters.popitem( last=False )
+
+        formatters[overrides] = formatter
+        return formatter
+
+    def _needs_caller(self, formatter=None):
+        """
+            Return True if some handler formatter receiving this logger records shows the caller
+            location, i.e., `%(funcName)s`, `%(lineno)d`, `%(pathname)s`, `%(filename)s` or
+            `%(module)s`. Otherwise, `findCaller()` does not need to walk the stack frames.
+
+            The handlers without a formatter, as QueueHandler and SocketHandler, pass the records
+            on to other code, which may use their caller location. The handlers created by
+            `setup()` always have a formatter. The filters of this logger and its handlers may
+            also read the caller location, see `_filters_use_caller()`.
+
+            The handlers are walked on every call, instead of caching the result, because their
+            formatters and filters can be replaced at any time, as with `handler.setFormatter()`.
+
+            @param `formatter` the formatter selected by the record, replacing the handlers formatters
+        """
+
+        if self.filters and _filters_use_caller( self.filters ):
+            return True
+
+        logger = self
+
+        while logger:
+
+            for handler in logger.handlers:
+                handler_formatter = handler.formatter
+
+                if handler_formatter is None: return True
+                if handler.filters and _filters_use_caller( handler.filters ): return True
+
+                # The record formatter replaces all handlers formatters, see Debugger::callHandlers()
+                if formatter:
+                    handler_formatter = formatter
+
+                if _formatter_uses_caller( handler_formatter ): return True
+
+            if not logger.propagate:
+                break
+
+            logger = logger.parent
+
+        return False
 
     def _log_clean(self, msg, args, kwargs):
+
+        if 'sample' in kwargs or 'every' in kwargs or 'per_second' in kwargs:
+            caller = sys._getframe( 2 )
+
+            if self._is_suppressed( ( caller.f_code.co_filename, caller.f_lineno ),
+                    kwargs.pop( 'sample', None ), kwargs.pop( 'every', None ), kwargs.pop( 'per_second', None ) ):
+                return
+
         record = CleanLogRecord( self.level, self.name, msg, args, kwargs )
+        record.debugFormatter = self.clean_formatter
         self.handle( record )
 
     @classmethod
@@ -1024,7 +1490,13 @@ class Debugger(Logger):
 
     @classmethod
     def _create_formatter(cls, arguments):
-        tick  = cls.getFormat( arguments, 'tick', "%(tickDifference).2e" )
+
+        if arguments['json']:
+            return JsonFormatter()
+
+        tick_format = "%(tickDifference).2e %(globalTickDifference).2e" if arguments['global_tick'] else "%(tickDifference).2e"
+
+        tick  = cls.getFormat( arguments, 'tick', tick_format )
         msecs = cls.getFormat( arguments, 'msecs', "%(msecs)010.6f", tick )
         levels = cls.getFormat( arguments, 'levels', "%(levelname)s%(debugLevel)s" )
 
@@ -1045,7 +1517,7 @@ class Debugger(Logger):
 
         # print("time '%s', msecs '%s', tick '%s', extra_spacing '%s', name '%s', function '%s', levels '%s', separator '%s' date_format '%s'" % ( time, msecs, tick, extra_spacing, name, function, levels, separator, date_format ) )
 
-        return logging.Formatter( "{}{}{}{}{}{}{}{}%(message)s".format(
+        return DebuggerFormatter( "{}{}{}{}{}{}{}{}%(message)s".format(
                 time, msecs, tick, extra_spacing, name, function, levels, separator ), date_format )
 
     @staticmethod
@@ -1064,16 +1536,20 @@ class Debugger(Logger):
         return value
 
     def _get_time_prefix(self, currentTime):
-        return [ "[%s]" % self.name,
-                " %02d" % currentTime.hour,
-                ":%02d" % currentTime.minute,
-                ":%02d" % currentTime.second,
-                ":%07d " % currentTime.microsecond ]
+        """
+            @param `currentTime` a `time.time()` timestamp
+        """
+        return [ "[%s] " % self.name,
+                format_timestamp( "%H:%M:%S", currentTime ),
+                ":%07d " % ( ( currentTime - int( currentTime ) ) * 1000000 ) ]
 
     def addHandler(self, handler):
         """
             Override the super() method to correctly set up `sys.stderr/stdout` handlers.
 
+            The handlers are added unchanged. The `clean()` and `basic()` formatters are selected by
+            Debugger::callHandlers().
+
             When adding a new handler and either `sys.stderr` or `sys.stdout` is enabled. It is
             required to check whether there is also a stream handler enabled, and if so, then, we
             need to add a log record filter to avoid infinity log records trying to be displayed.
@@ -1100,6 +1576,62 @@ class Debugger(Logger):
             # else: # TODO: Support other this logic also for other handlers and the builtin _stream and _file
 
         super( Debugger, self ).addHandler( handler )
+        Debugger._hierarchy_generation += 1
+
+    def callHandlers(self, record):
+        """
+            Override the super() method to format the records which select their formatter, as the
+            `clean()` and `basic()` records, with it, on all handlers receiving them.
+
+            The handlers created by `setup()` format the records with a `RecordFormatter`, which
+            selects the record formatter by itself. On the other handlers, the record formatter
+            replaces the handler formatter only while the handler handles the record, holding the
+            handler lock, so the handler concurrent records and the user formatter are not changed.
+            See also logging::Logger::callHandlers().
+        """
+        formatter = getattr( record, "debugFormatter", None )
+
+        if formatter is None:
+            super( Debugger, self ).callHandlers( record )
+            return
+
+        logger = self
+        found = False
+
+        while logger:
+
+            for handler in logger.handlers:
+                found = True
+
+                if record.levelno >= handler.level:
+                    handler_formatter = handler.formatter
+
+                    if isinstance( handler_formatter, RecordFormatter ):
+                        handler.handle( record )
+                        continue
+
+                    handler.acquire()
+
+                    try:
+                        handler.formatter = formatter
+
+                        try:
+                            handler.handle( record )
+
+                        finally:
+                            handler.formatter = handler_formatter
+
+                    finally:
+                        handler.release()
+
+            if not logger.propagate:
+                break
+
+            logger = logger.parent
+
+        # Let the super() method use the `logging.lastResort` handler or warn about no handlers
+        if not found:
+            super( Debugger, self ).callHandlers( record )
 
     def removeHandler(self, handler):
         """
@@ -1109,6 +1641,12 @@ class Debugger(Logger):
             See also logging::Logger::removeHandler().
         """
 
+        # Write the pending "last message repeated N times" records before the handler is gone
+        for handler_filter in handler.filters:
+
+            if isinstance( handler_filter, DeduplicationFilter ):
+                handler_filter.flush()
+
         if self._has_file_context_filter:
 
             if not self._stderr and not self._stdout or not self._file or not self._stream:
@@ -1129,6 +1667,7 @@ class Debugger(Logger):
             # else: # TODO: Support other this logic also for other handlers and the builtin _stream and _file
 
         super( Debugger, self ).removeHandler( handler )
+        Debugger._hierarchy_generation += 1
 
     @classmethod
     def deleteAllLoggers(cls):
@@ -1139,6 +1678,8 @@ class Debugger(Logger):
 
         try:
             cls.manager.loggerDict.clear()
+            cls.manager.descendants.clear()
+            Debugger._hierarchy_generation += 1
 
         except Exception:
             cls.exception("Could not delete all registered loggers!")
@@ -1151,7 +1692,7 @@ class Debugger(Logger):
         _acquireLock()
 
         try:
-            del self.manager.loggerDict[self.name]
+            self.manager.removeLogger( self.name )
 
         except Exception:
             self.exception("Could not delete the logger %s!", self.name)
@@ -1165,7 +1706,7 @@ class Debugger(Logger):
             Delete all handlers registered to the current logger.
         """
         if self._debugme: sys.stderr.write( "Removing all handlers from %s...\n" % self.name )
-        self._disable( stream=True, file=True )
+        self._disable( stream=True, file=True, ring=True )
 
         for handler in self.handlers:
             self.removeHandler( handler )
@@ -1197,19 +1738,13 @@ class Debugger(Logger):
             when is set to automatically setup the logger. If you are not using the automatic setup
             you do not need to use this function because you should know what you are doing and how
             you should setup your own loggers.
-        """
-        loggers = Debugger.manager.loggerDict
-        parent_name = self.name
-        parent_name_length = len( parent_name )
-
-        for logger_name in loggers:
-            logger = loggers[logger_name]
 
-            if not isinstance( logger, PlaceHolder ):
+            Only the logger descendants are visited, or the top level loggers for the root logger, as
+            returned by DebuggerManager::getDescendants().
+        """
 
-                # i.e., if logger.parent.name.startswith( parent_name )
-                if logger.parent.name[:parent_name_length] == parent_name:
-                    callable_action( logger )
+        for logger in Debugger.manager.getDescendants( self ):
+            callable_action( logger )
 
     @classmethod
     def get_debug_file_path(cls, file_path):
@@ -1220,20 +1755,28 @@ class Debugger(Logger):
             Convert "D:/User/Downloads/debug.txt"
             To "/cygwin/D/User/Downloads/debug.txt"
             To "/mnt/D/User/Downloads/debug.txt"
+
+            The absolute paths translations are cached by `_translated_paths`, and the platform
+            is only probed once, see `_get_path_translation()`.
         """
-        is_absolute   = os.path.isabs( file_path )
-        platform_info = platform.platform( True ).lower()
 
-        if is_absolute \
-                and not file_path.startswith( "/cygdrive/" ) \
-                and "cygwin" in platform_info:
+        if not os.path.isabs( file_path ):
+            return os.path.abspath( file_path )
+
+        new_output = _translated_paths.get( file_path )
+
+        if new_output:
+            return new_output
+
+        path_translation = _get_path_translation()
+
+        if path_translation == "cygwin" \
+                and not file_path.startswith( "/cygdrive/" ):
 
             new_output = "/cygdrive/" + cls.remove_windows_driver_letter( file_path )
 
-        elif is_absolute \
-                and not file_path.startswith( "/mnt/" ) \
-                and "linux" in platform_info \
-                and "microsoft" in platform_info:
+        elif path_translation == "wsl" \
+                and not file_path.startswith( "/mnt/" ):
 
             new_output = cls.remove_windows_driver_letter( file_path )
             new_output = "/mnt/" + new_output[0].lower() + new_output[1:]
@@ -1241,10 +1784,12 @@ class Debugger(Logger):
         else:
             new_output = os.path.abspath( file_path )
 
-        # print( "Debugger, is_absolute:   %s" % is_absolute )
-        # print( "Debugger, new_output:    %s" % new_output )
-        # print( "Debugger, isabs:         %s" % str( os.path.isabs( new_output ) ) )
-        # print( "Debugger, platform_info: %s" % platform_info )
+        # print( "Debugger, new_output:       %s" % new_output )
+        # print( "Debugger, isabs:            %s" % str( os.path.isabs( new_output ) ) )
+        # print( "Debugger, path_translation: %s" % path_translation )
+        if len( _translated_paths ) < _translated_paths_size:
+            _translated_paths[file_path] = new_output
+
         return new_output
 
     @classmethod
@@ -1308,6 +1853,9 @@ class Debugger(Logger):
     # the correct function name, otherwise the result would always be `__call__`, which is the
     # internal function we use here.
     #
+    # The `os.path.normcase()` comparison against the logging module `_srcfile` is also cached for
+    # each code object file name on `_logging_frames`, instead of being recomputed for every log record.
+    #
     # Find the stack frame of the caller so that we can note the source file name, line number
     # and function name.
     if is_python2:
@@ -1322,8 +1870,10 @@ class Debugger(Logger):
             rv = "(unknown file)", 0, "(unknown function)"
             while hasattr(f, "f_code"):
                 co = f.f_code
-                filename = os.path.normcase(co.co_filename)
-                if filename == _srcfile:
+                is_logging_frame = _logging_frames.get(co.co_filename)
+                if is_logging_frame is None:
+                    is_logging_frame = _logging_frames[co.co_filename] = os.path.normcase(co.co_filename) == _srcfile
+                if is_logging_frame:
                     f = f.f_back
                     continue
                 rv = (co.co_filename, f.f_lineno, co.co_name)
@@ -1332,8 +1882,8 @@ class Debugger(Logger):
 
     elif is_less_than_python_38:
 
-        # Python 3.6.3
-        def findCaller(self, stack_info=False):
+        # Python 3.6.3, the `stacklevel` argument is only available on Python 3.8
+        def findCaller(self, stack_info=False, stacklevel=1):
             f = currentframe(self._frame_level + 1)
             #On some versions of IronPython, currentframe() returns None if
             #IronPython isn't run with -X:Frames.
@@ -1342,12 +1892,15 @@ class Debugger(Logger):
             rv = "(unknown file)", 0, "(unknown function)", None
             while hasattr(f, "f_code"):
                 co = f.f_code
-                filename = os.path.normcase(co.co_filename)
-                if filename == _srcfile:
+                is_logging_frame = _logging_frames.get(co.co_filename)
+                if is_logging_frame is None:
+                    is_logging_frame = _logging_frames[co.co_filename] = os.path.normcase(co.co_filename) == _srcfile
+                if is_logging_frame:
                     f = f.f_back
                     continue
                 sinfo = None
                 if stack_info:
+                    import traceback
                     sio = io.StringIO()
                     sio.write('Stack (most recent call last):\n')
                     traceback.print_stack(f, file=sio)
@@ -1375,12 +1928,15 @@ class Debugger(Logger):
             rv = "(unknown file)", 0, "(unknown function)", None
             while hasattr(f, "f_code"):
                 co = f.f_code
-                filename = os.path.normcase(co.co_filename)
-                if filename == _srcfile:
+                is_logging_frame = _logging_frames.get(co.co_filename)
+                if is_logging_frame is None:
+                    is_logging_frame = _logging_frames[co.co_filename] = os.path.normcase(co.co_filename) == _srcfile
+                if is_logging_frame:
                     f = f.f_back
                     continue
                 sinfo = None
                 if stack_info:
+                    import traceback
                     sio = io.StringIO()
                     sio.write('Stack (most recent call last):\n')
                     traceback.print_stack(f, file=sio)
@@ -1438,54 +1994,339 @@ class FastDebugger(Debugger):
             self._log( DEBUG, msg, args, **kwargs )
 
 
-class _SmartLogRecord(object):
+class CallSite(object):
     """
-        Creates a LogRecord which concatenates trailing arguments instead of raising an exception.
+        The counters of a call site rate limited by the `sample`, `every` and `per_second`
+        arguments of `Debugger.__call__()`.
     """
+    __slots__ = ( "calls", "suppressed", "second", "second_records" )
 
-    def _getMessage(self, remaining_arguments):
-        """
-            Use a function to force exception handling not break the while loop where this is used.
-        """
+    def __init__(self):
+        self.calls = 0
+        self.suppressed = 0
+        self.second = None
+        self.second_records = 0
 
-        try:
-            args = self.args
 
-            if args:
+class Span(object):
+    """
+        A timing span created by `Debugger.span()`.
 
-                # https://stackoverflow.com/questions/53002709/why-var-1-variable-prints-var-instead-of-raising-the-exception-typeer
-                if isinstance( args, MutableMapping ):
-                    new_msg = self.msg % args
+        @param `stacklevel` the `Debugger._log()` stacklevel of the record logged on exit
+    """
+    __slots__ = ( "logger", "debug_level", "name", "parent", "start", "stacklevel" )
 
-                    if new_msg == self.msg:
-                        remaining_arguments.append( str( args ) )
-                        remaining_arguments.append( new_msg )
+    def __init__(self, logger, debug_level, name, stacklevel=1):
+        self.logger = logger
+        self.debug_level = debug_level
+        self.name = name
+        self.stacklevel = stacklevel
 
-                    else:
-                        remaining_arguments.append( new_msg )
+    def __enter__(self):
+        parent = self.parent = _get_current_span( None )
 
-                else:
-                    remaining_arguments.append( self.msg % args )
+        if parent:
+            self.name = parent.name + "/" + self.name
 
-            else:
-                remaining_arguments.append( self.msg )
+        _set_current_span( self )
+        self.start = timeit.default_timer()
+        return self
 
-            return False
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = timeit.default_timer()
+        duration = end - self.start
 
-        # A logging error should not stop the running program
-        # except (TypeError, ValueError) as error:
-        except Exception as error:
-            self.args = args[:-1]
+        _set_current_span( self.parent )
+        logger = self.logger
+        name = self.name
 
-            # print('error', error)
-            remaining_arguments.append( str( args[-1] ) )
+        histograms = logger._span_histograms
+        histogram = histograms.get( name )
 
-            if len( args ) - 1 > 0:
-                return True
+        if histogram is None:
+            histogram = histograms.setdefault( name, SpanHistogram() )
 
-            else:
-                remaining_arguments.append( self.msg )
-                return False
+        histogram.add( duration )
+        logger._log( DEBUG, "%s took %.2e seconds", ( name, duration ), debug_level=self.debug_level,
+                stacklevel=self.stacklevel, extra={ "spanStart": self.start, "spanEnd": end, "spanDuration": duration } )
+
+
+class DisabledSpan(object):
+    """
+        The no-op `Span` returned by `Debugger.span()` while its `debug_level` is disabled.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+disabled_span = DisabledSpan()
+
+
+class SpanHistogram(object):
+    """
+        The count, total, minimum and maximum durations of a span name, with the count of durations
+        below each power of two microseconds, as `<2.56e-04: 7` for below 256 microseconds.
+    """
+    __slots__ = ( "count", "total", "minimum", "maximum", "buckets", "_lock" )
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = 0.0
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def add(self, duration):
+        bucket = int( duration * 1000000 ).bit_length()
+
+        with self._lock:
+            self.count += 1
+            self.total += duration
+            self.buckets[bucket] = self.buckets.get( bucket, 0 ) + 1
+
+            if self.minimum is None or duration < self.minimum:
+                self.minimum = duration
+
+            if duration > self.maximum:
+                self.maximum = duration
+
+    def __str__(self):
+
+        with self._lock:
+            buckets = ", ".join( "<%.2e: %d" % ( ( 1 << bucket ) / 1000000.0, count )
+                    for bucket, count in sorted( self.buckets.items() ) )
+
+            return "count %d, total %.2e, minimum %.2e, mean %.2e, maximum %.2e, buckets %s" % (
+                    self.count, self.total, self.minimum or 0.0, self.total / ( self.count or 1 ),
+                    self.maximum, buckets )
+
+
+class BitwiseLogger(object):
+    """
+        The enabled bitwise level logger returned by `Debugger.bitwise()`.
+
+        Its class is swapped between this one and the `DisabledBitwiseLogger` every time the logger
+        `debug_level` changes, as the `Debugger` class is swapped by `_setup_fast_loggers()`.
+    """
+    __slots__ = ("logger", "debug_level")
+
+    def __init__(self, logger, debug_level):
+        self.logger = logger
+        self.debug_level = debug_level
+        self._update()
+
+    def _update(self):
+
+        if self.logger._debugger_level & self.debug_level != 0:
+            self.__class__ = BitwiseLogger
+
+        else:
+            self.__class__ = DisabledBitwiseLogger
+
+    def __call__(self, msg, *args, **kwargs):
+        kwargs['debug_level'] = self.debug_level
+        self.logger._log( DEBUG, msg, args, **kwargs )
+
+
+class DisabledBitwiseLogger(BitwiseLogger):
+    """
+        The no-op version of the `BitwiseLogger`, used while its `debug_level` is disabled.
+    """
+    __slots__ = ()
+
+    def __call__(self, *args, **kwargs):
+        pass
+
+
+class RecordFormatter(logging.Formatter):
+    """
+        Formats the log records with the formatter selected by their `debugFormatter` attribute, or
+        with the handler formatter it wraps when the record does not select one.
+
+        This allows `clean()`, `basic()` and the per call formatting arguments as `log(1, "x",
+        time=False)` to use their formatters without replacing the handlers formatters, which
+        would require locking all threads and race with their concurrent records.
+
+        It is used by the handlers created by `setup()`. The other handlers have their formatter
+        replaced while handling these records, holding their lock, see Debugger::callHandlers().
+    """
+
+    def __init__(self, formatter=None):
+        super( RecordFormatter, self ).__init__()
+        self.formatter = formatter
+
+    @property
+    def _uses_caller(self):
+        return _formatter_uses_caller( self.formatter )
+
+    def format(self, record):
+        formatter = getattr( record, "debugFormatter", None ) or self.formatter or logging._defaultFormatter
+        return formatter.format( record )
+
+
+class lazy(object):
+    """
+        Wraps a log message argument which is expensive to compute, as `repr()` of a big object,
+        so it is only computed when a handler formats the record. When the logger `debug_level`
+        is disabled, or no handler formats the record, the `function` is never called.
+
+            log( 8, "State %s", lazy( get_representation, state ) )
+
+        The `function` result is computed once, and shared by all handlers formatting the record.
+        Plain callables passed as arguments are not called, as their `str()` is already logged.
+    """
+    __slots__ = ( "function", "args", "kwargs", "_value" )
+
+    def __init__(self, function, *args, **kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self._value = _not_evaluated
+
+    @property
+    def value(self):
+        value = self._value
+
+        if value is _not_evaluated:
+            value = self._value = self.function( *self.args, **self.kwargs )
+
+        return value
+
+    def __str__(self):
+        return str( self.value )
+
+    def __repr__(self):
+        return repr( self.value )
+
+    def __format__(self, format_spec):
+        return format( self.value, format_spec )
+
+    def __int__(self):
+        return int( self.value )
+
+    def __float__(self):
+        return float( self.value )
+
+    def __index__(self):
+        return self.value.__index__()
+
+
+class DebuggerFormatter(logging.Formatter):
+    """
+        The formatter created by `Debugger._create_formatter()`. It produces the same output as a
+        `logging.Formatter` with the same `fmt` and `datefmt`, but it reads the record attributes
+        by position, instead of by name from `record.__dict__`, and it only calls
+        `time.strftime()` once per second with `format_timestamp()`.
+    """
+
+    def __init__(self, fmt=None, datefmt=None):
+        super( DebuggerFormatter, self ).__init__( fmt, datefmt )
+        fmt = self._fmt
+        names = []
+
+        def positional(match):
+            name = match.group( 1 )
+
+            if name is None:
+                return "%%"
+
+            names.append( name )
+            return "%"
+
+        self._positional_fmt = _format_attribute.sub( positional, fmt )
+        self._uses_time = "%(asctime)" in fmt
+        self._uses_caller = any( attribute in fmt for attribute in _caller_attributes )
+
+        if len( names ) == 1:
+            get_attribute = attrgetter( names[0] )
+            self._get_attributes = lambda record: ( get_attribute( record ), )
+
+        elif names:
+            self._get_attributes = attrgetter( *names )
+
+        else:
+            self._get_attributes = lambda record: ()
+
+    def usesTime(self):
+        return self._uses_time
+
+    def formatTime(self, record, datefmt=None):
+
+        if not datefmt:
+            return super( DebuggerFormatter, self ).formatTime( record, datefmt )
+
+        return format_timestamp( datefmt, record.created, self.converter )
+
+    def format(self, record):
+
+        if record.exc_info or record.exc_text or getattr( record, "stack_info", None ):
+            return super( DebuggerFormatter, self ).format( record )
+
+        record.message = record.getMessage()
+
+        if self._uses_time:
+            record.asctime = self.formatTime( record, self.datefmt )
+
+        return self._positional_fmt % self._get_attributes( record )
+
+
+class JsonFormatter(logging.Formatter):
+    """
+        Formats the records as JSON objects, with a fixed set of attributes, for the log shippers
+        which would otherwise parse the `Debugger._create_formatter()` output with regexes.
+
+        The exception and stack information are appended to the `message` attribute, as the
+        standard `logging.Formatter` appends them to its output.
+    """
+    _uses_caller = True
+
+    def __init__(self, *args, **kwargs):
+        super( JsonFormatter, self ).__init__( *args, **kwargs )
+
+        from json.encoder import encode_basestring_ascii
+        self._json_string = encode_basestring_ascii
+
+    def format(self, record):
+        record.message = message = record.getMessage()
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException( record.exc_info )
+
+        if record.exc_text:
+            message = message + "\n" + record.exc_text
+
+        stack_info = getattr( record, "stack_info", None )
+
+        if stack_info:
+            message = message + "\n" + self.formatStack( stack_info )
+
+        debug_level = getattr( record, "debugLevel", "" )
+        funcName = record.funcName
+        _json_string = self._json_string
+
+        return '{"name": %s, "debugLevel": %d, "levelname": %s, "funcName": %s, "lineno": %d, ' \
+                '"created": %r, "tickDifference": %r, "message": %s}' % (
+                    _json_string( record.name ),
+                    int( debug_level[1:-1] ) if debug_level else 0,
+                    _json_string( record.levelname ),
+                    "null" if funcName is None else _json_string( funcName ),
+                    record.lineno or 0,
+                    record.created,
+                    getattr( record, "tickDifference", 0.0 ),
+                    _json_string( message ),
+                )
+
+
+class _SmartLogRecord(object):
+    """
+        Creates a LogRecord which concatenates trailing arguments instead of raising an exception.
+    """
+    debugFormatter = None
 
     def getMessage(self):
         """
@@ -1493,58 +2334,395 @@ class _SmartLogRecord(object):
 
         Return the message for this LogRecord after merging any user-supplied
         arguments with the message.
+
+        The trailing arguments not consumed by the message `%` conversion are appended to it. If
+        the conversion fails, all the arguments are appended to the unformatted message.
         """
         # print('self.msg', self.msg, ', self.args', self.args)
-        remaining_arguments = []
-        self.msg = str( self.msg )
+        self.msg = msg = str( self.msg )
+        args = self.args
+
+        if not args:
+            return msg
+
+        # https://stackoverflow.com/questions/53002709/why-var-1-variable-prints-var-instead-of-raising-the-exception-typeer
+        if isinstance( args, MutableMapping ):
+            new_msg = msg % args
+
+            if new_msg == msg:
+                return new_msg + " " + str( args )
+
+            return new_msg
+
+        template = _message_templates.get( msg )
+
+        if template is None:
+            template = MessageTemplate( msg )
+
+            if len( _message_templates ) < _message_templates_size:
+                template = _message_templates.setdefault( msg, template )
+
+        template.hits += 1
+        arguments = template.arguments
+        message = msg
+
+        if arguments and arguments <= len( args ):
+
+            # A logging error should not stop the running program
+            try:
+                message = msg % args[:arguments]
+
+            # The arguments types may not match the template conversions
+            except Exception:
+                arguments = 0
+
+        else:
+            arguments = 0
+
+        if arguments < len( args ):
+            return message + " " + " ".join( str( argument ) for argument in args[arguments:] )
 
-        # https://stackoverflow.com/questions/38127563/handle-an-exception-in-a-while-loop
-        while self._getMessage( remaining_arguments ): pass
-        return " ".join( reversed( remaining_arguments ) )
+        return message
 
 
 class SmartLogRecord(_SmartLogRecord, LogRecord):
     pass
 
 
+class _CleanLogRecordAttributes(dict):
+    """
+        The CleanLogRecord `__dict__`, which returns the constant record attributes not set on it,
+        so `logging.Formatter` can still find them with `fmt % record.__dict__`.
+    """
+    __slots__ = ()
+
+    def __missing__(self, key):
+        return CleanLogRecord._attributes[key]
+
+
 class CleanLogRecord(_SmartLogRecord):
+    """
+        A LogRecord without the caller location, time and thread information, used by `clean()`
+        and the `sys.stderr/stdout` capture. Only the message attributes are set for each record,
+        the constant ones are read from `_attributes` when accessed.
+    """
+    _attributes = {
+        "pathname": "No Path Name",
+        "filename": "No Filename",
+        "module": "Unknown module",
+        "debugLevel": "",
+        "tickDifference": 0.0,
+        "globalTickDifference": 0.0,
+        "exc_info": None,
+        "exc_text": None,
+        "stack_info": None,
+        "lineno": 0,
+        "funcName": "No Function",
+        "created": 0,
+        "msecs": 0,
+        "relativeCreated": 0,
+        "thread": None,
+        "threadName": None,
+        "processName": None,
+        "process": None,
+    }
 
     def __init__(self, level, name, msg, args, kwargs):
-        # https://stackoverflow.com/questions/9728243/is-self-dict-updatekwargs-good-or-poor-style
         if 'extra' in kwargs:
-            for key, value in kwargs['extra'].items(): setattr( self, key, value )
-        self.name = name
-        self.msg = msg
-        self.levelno = level
+            extra = kwargs['extra']
+            attributes = _CleanLogRecordAttributes( extra )
 
-        self.levelname = getLevelName( level )
-        self.pathname = "No Path Name"
-        self.filename = "No Filename"
-        self.module = "Unknown module"
+            # The extra attributes do not replace the record attributes
+            for key in extra:
+                if key in self._attributes: del attributes[key]
 
-        self.debugLevel = ""
-        self.tickDifference = 0.0
+        else:
+            attributes = _CleanLogRecordAttributes()
 
-        self.exc_info = None
-        self.exc_text = None
-        self.stack_info = None
-        self.lineno = 0
+        attributes['name'] = name
+        attributes['msg'] = msg
+        attributes['args'] = args
+        attributes['levelno'] = level
+        attributes['levelname'] = getLevelName( level )
 
-        self.args = args
-        self.funcName = "No Function"
-        self.created = 0
-        self.msecs = 0
-        self.relativeCreated = 0
+        # https://stackoverflow.com/questions/9728243/is-self-dict-updatekwargs-good-or-poor-style
+        self.__dict__ = attributes
+
+    def __getattr__(self, name):
+
+        try:
+            return self._attributes[name]
 
-        self.thread = None
-        self.threadName = None
-        self.processName = None
-        self.process = None
+        except KeyError:
+            raise AttributeError( "'CleanLogRecord' object has no attribute '%s'" % name )
 
     def __str__(self):
         return '<CleanLogRecord: %s, %s, %s, %s, "%s">'%(self.name, self.levelno,
                 self.pathname, self.lineno, self.msg)
 
+class BufferedFileHandler(logging.FileHandler):
+    """
+        A FileHandler which coalesces the formatted records on a write buffer, instead of writing
+        and flushing the file after every record.
+
+        The buffer is written to the file when it reaches `size` characters, `interval` seconds
+        after its first record, when a record with level WARNING or above is emitted, or when the
+        process exits, as `logging.shutdown()` flushes and closes all handlers.
+
+        The `interval` writes are done by a single flusher thread, started by the first buffered
+        record and stopped by `close()`, instead of starting a new thread for each interval.
+    """
+    terminator = "\n"
+
+    def __init__(self, filename, mode='a', size=65536, interval=1.0):
+        super( BufferedFileHandler, self ).__init__( filename, mode )
+        self.size = size
+        self.interval = interval
+
+        self._buffer = []
+        self._buffered = 0
+
+        self._flusher = None
+        self._pending = threading.Event()
+        self._closing = threading.Event()
+
+    def emit(self, record):
+
+        try:
+            msg = self.format( record ) + self.terminator
+            self._buffer.append( msg )
+            self._buffered += len( msg )
+
+            if self._buffered >= self.size or record.levelno >= WARNING:
+                self.flush()
+
+            elif not self._pending.is_set():
+
+                if self._flusher is None and not self._closing.is_set():
+                    self._flusher = threading.Thread( target=self._flush_periodically, name="BufferedFileHandler" )
+                    self._flusher.daemon = True
+                    self._flusher.start()
+
+                self._pending.set()
+
+        except Exception:
+            self.handleError( record )
+
+    def _flush_periodically(self):
+        """
+            Write the buffer `interval` seconds after its first record, until the handler is closed.
+        """
+        pending = self._pending
+        closing = self._closing
+
+        while True:
+            pending.wait()
+
+            # `close()` writes the buffer itself
+            if closing.wait( self.interval ):
+                return
+
+            self.flush()
+
+    def flush(self):
+        """
+            Write the buffered records to the file and flush it.
+        """
+        self.acquire()
+
+        try:
+            self._pending.clear()
+
+            if self._buffer:
+
+                if self.stream is None:
+                    self.stream = self._open()
+
+                self.stream.write( "".join( self._buffer ) )
+                del self._buffer[:]
+                self._buffered = 0
+
+            if self.stream and hasattr( self.stream, "flush" ):
+                self.stream.flush()
+
+        finally:
+            self.release()
+
+    def close(self):
+        """
+            Stop the flusher thread, then, write the buffer and close the file.
+
+            The flusher thread is not joined, as `logging.shutdown()` calls this holding the handler
+            lock, which the flusher thread may be waiting for.
+        """
+        self._closing.set()
+        self._pending.set()
+
+        self._flusher = None
+        super( BufferedFileHandler, self ).close()
+
+
+class AsynchronousHandler(logging.Handler):
+    """
+        Puts a bounded queue in front of the `handler`, so the records are formatted and written by
+        a background writer thread, instead of the thread calling the logger.
+
+        The handler `terminator` is saved together with each queued record, then, the
+        `sys.stderr/stdout` replacements can still change it while writing their records.
+
+        @param `size`      the maximum number of records waiting on the queue
+        @param `overflow`  what to do when the queue is full: `block` the logging thread until the
+                           writer thread makes room, `drop-oldest` to discard the oldest queued
+                           record or `drop-new` to discard the new record. The discarded records
+                           are counted by the `dropped` attribute.
+    """
+    overflow_policies = ( "block", "drop-oldest", "drop-new" )
+
+    def __init__(self, handler, size=10000, overflow="block"):
+
+        if overflow not in self.overflow_policies:
+            raise ValueError( "Error: The overflow `%s` must be one of %s" % ( overflow, self.overflow_policies ) )
+
+        self.handler = handler
+        super( AsynchronousHandler, self ).__init__()
+
+        self.size = size
+        self.overflow = overflow
+        self.dropped = 0
+
+        # Share the handler formatter, so Debugger::_needs_caller() knows what it uses
+        self.formatter = handler.formatter
+        self.terminator = self._terminator = getattr( handler, "terminator", "\n" )
+
+        self._records = deque()
+        self._pending = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._writer = threading.Thread( target=self._write_records, name="AsynchronousHandler" )
+        self._writer.daemon = True
+        self._writer.start()
+
+    def __getattr__(self, name):
+        """
+            Only called for attributes not found on this handler, as the FileHandler `baseFilename`.
+        """
+        if name == "handler":
+            raise AttributeError( name )
+
+        return getattr( self.handler, name )
+
+    def setFormatter(self, formatter):
+        self.formatter = formatter
+        self.handler.setFormatter( formatter )
+
+    def handle(self, record):
+        """
+            Queue the record without acquiring the handler lock, which would serialize all threads.
+        """
+        is_accepted = self.filter( record )
+
+        if is_accepted:
+            self.emit( record )
+
+        return is_accepted
+
+    def emit(self, record):
+
+        # The writer thread cannot wait for itself, i.e., when the handler writes to `sys.stderr`
+        if threading.current_thread() is self._writer:
+            self.handler.handle( record )
+            return
+
+        condition = self._condition
+        records = self._records
+
+        with condition:
+
+            if self._closed:
+                return
+
+            while len( records ) >= self.size:
+
+                if self.overflow == "block":
+                    condition.wait()
+
+                elif self.overflow == "drop-oldest":
+                    records.popleft()
+                    self.dropped += 1
+
+                else:
+                    self.dropped += 1
+                    return
+
+            records.append( ( record, self.terminator ) )
+            condition.notify_all()
+
+    def _write_records(self):
+        condition = self._condition
+        records = self._records
+        handler = self.handler
+
+        while True:
+
+            with condition:
+
+                while not records and not self._closed:
+                    condition.wait()
+
+                if not records:
+                    return
+
+                batch = list( records )
+                records.clear()
+
+                self._pending = len( batch )
+                condition.notify_all()
+
+            for record, terminator in batch:
+
+                if terminator == self._terminator:
+                    handler.handle( record )
+
+                else:
+                    handler.terminator = terminator
+                    handler.handle( record )
+                    handler.terminator = self._terminator
+
+            with condition:
+                self._pending = 0
+                condition.notify_all()
+
+    def flush(self):
+        """
+            Wait until the writer thread writes all queued records, then flush the handler.
+        """
+
+        if threading.current_thread() is not self._writer:
+
+            with self._condition:
+
+                while self._records or self._pending:
+                    self._condition.wait()
+
+        self.handler.flush()
+
+    def close(self):
+        """
+            Write all queued records, stop the writer thread and close the handler.
+        """
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+        if threading.current_thread() is not self._writer:
+            self._writer.join()
+
+        self.handler.close()
+        super( AsynchronousHandler, self ).close()
+
+
 class FileHandlerContextFilter(logging.Filter):
     """
         This filter avoids duplicated information to be displayed to the StreamHandler log.
@@ -1554,15 +2732,256 @@ class FileHandlerContextFilter(logging.Filter):
         return not "_duplicated_from_file" in record.__dict__
 
 
+class DeduplicationFilter(logging.Filter):
+    """
+        Suppresses the consecutive records with the same message from the same call site, counting
+        them. When a different record arrives, `interval` seconds after the first suppressed record
+        or when the program exits, a "last message repeated N times" record is written with the
+        `handler`, instead of all of them.
+
+        @param `handler`   the handler this filter is added to
+        @param `interval`  the maximum seconds to wait before writing the repeated records count
+    """
+
+    def __init__(self, handler, interval=1.0):
+        super( DeduplicationFilter, self ).__init__()
+        self.handler = handler
+        self.interval = interval
+
+        self._key = None
+        self._count = 0
+        self._last = None
+        self._timer = None
+
+        self._lock = threading.Lock()
+        _deduplication_filters.add( self )
+
+    def filter(self, record):
+
+        if getattr( record, "_repeated_records", False ):
+            return True
+
+        key = ( record.name, record.levelno, record.pathname, record.lineno, record.getMessage() )
+
+        with self._lock:
+
+            if key == self._key:
+                self._last = record
+                self._count += 1
+
+                if self._timer is None:
+                    self._timer = threading.Timer( self.interval, self.flush )
+                    self._timer.daemon = True
+                    self._timer.start()
+
+                return False
+
+            summary = self._summary()
+            self._key = key
+            self._last = record
+
+        if summary:
+            self._write( summary )
+
+        return True
+
+    def flush(self):
+        """
+            Write the count of suppressed records, if any.
+        """
+
+        with self._lock:
+            summary = self._summary()
+
+        if summary:
+            self._write( summary )
+
+    def _summary(self):
+        """
+            Create the "last message repeated N times" record and restart the count, holding `_lock`.
+        """
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._count:
+            return None
+
+        last = self._last
+        summary = SmartLogRecord( last.name, last.levelno, last.pathname, last.lineno,
+                "last message repeated %s times", ( self._count, ), None, last.funcName )
+
+        summary.debugLevel = getattr( last, "debugLevel", "" )
+        summary.tickDifference = 0.0
+        summary.globalTickDifference = 0.0
+        summary.debugFormatter = getattr( last, "debugFormatter", None )
+        summary._repeated_records = True
+
+        self._count = 0
+        return summary
+
+    def _write(self, summary):
+        handler = self.handler
+
+        # The `sys.stderr/stdout` capture writes its records without the handler terminator, and
+        # the `interval` timer thread writes concurrently with it, hence the reentrant handler lock
+        handler.acquire()
+
+        try:
+            if getattr( handler, "terminator", None ) == "":
+                handler.terminator = "\n"
+
+                try:
+                    handler.handle( summary )
+
+                finally:
+                    handler.terminator = ""
+
+            else:
+                handler.handle( summary )
+
+        finally:
+            handler.release()
+
+
+# The deduplication filters which still may have suppressed records to write on exit
+_deduplication_filters = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_deduplication_filters():
+
+    for deduplication_filter in list( _deduplication_filters ):
+        deduplication_filter.flush()
+
+
+# The `Debugger.get_debug_file_path()` absolute paths translations, bounded by `_translated_paths_size`
+_translated_paths = {}
+_translated_paths_size = 4096
+
+# The platform absolute paths translation, computed by the first `_get_path_translation()` call
+_path_translation = None
+
+
+def _get_path_translation():
+    """
+        Return `cygwin` or `wsl` if the absolute paths need to be translated to this platform
+        drives mount points, or an empty string otherwise. As `platform.platform()` may spawn
+        processes, it is only called once.
+    """
+    global _path_translation
+
+    if _path_translation is None:
+        import platform
+        platform_info = platform.platform( True ).lower()
+
+        if "cygwin" in platform_info:
+            _path_translation = "cygwin"
+
+        elif "linux" in platform_info and "microsoft" in platform_info:
+            _path_translation = "wsl"
+
+        else:
+            _path_translation = ""
+
+    return _path_translation
+
+
+def _rotating_file_handler(output_file, maxBytes, backupCount):
+    """
+        Return a ConcurrentRotatingFileHandler, falling back to the basic FileHandler when the
+        optional `concurrent_log_handler` package is not available.
+    """
+
+    try:
+        from concurrent_log_handler import ConcurrentRotatingFileHandler
+
+    except( ImportError, ValueError ):
+        return logging.FileHandler( output_file )
+
+    return ConcurrentRotatingFileHandler( output_file, maxBytes=maxBytes, backupCount=backupCount )
+
+
+class DebuggerManager(Manager):
+    """
+        The `Manager` of the Debugger loggers hierarchy, which invalidates the cached
+        `Debugger.active` loggers when a new logger is created, as it may become the parent of
+        already existing loggers.
+
+        Each created logger is also indexed on `descendants` under all its ancestors names, i.e.,
+        `a.b.c` is indexed under `a` and `a.b`, so its ancestors can find it without scanning all
+        the `loggerDict`.
+    """
+
+    def __init__(self, rootnode):
+        super( DebuggerManager, self ).__init__( rootnode )
+        self.descendants = {}
+
+    def getLogger(self, name):
+        placeholder = self.loggerDict.get( name )
+        logger = super( DebuggerManager, self ).getLogger( name )
+
+        if placeholder is not logger:
+            Debugger._hierarchy_generation += 1
+            descendants = self.descendants
+
+            for ancestor in self._ancestors( name ):
+                descendants.setdefault( ancestor, {} )[name] = logger
+
+        return logger
+
+    def getDescendants(self, logger):
+        """
+            Return the list of loggers created below `logger` in the hierarchy, or the top level
+            loggers, i.e., the ones whose parent is the root logger, if `logger` is the root logger.
+        """
+        root = self.root
+
+        if logger is root:
+            return [ child for child in list( self.loggerDict.values() )
+                    if not isinstance( child, PlaceHolder ) and child.parent is root ]
+
+        loggers = self.descendants.get( logger.name, {} ).values()
+        return [ logger for logger in list( loggers ) if not isinstance( logger, PlaceHolder ) ]
+
+    def removeLogger(self, name):
+        """
+            Remove the logger `name` from the `loggerDict` and the `descendants` index.
+        """
+        del self.loggerDict[name]
+        Debugger._hierarchy_generation += 1
+
+        for ancestor in self._ancestors( name ):
+            self.descendants.get( ancestor, {} ).pop( name, None )
+
+    @staticmethod
+    def _ancestors(name):
+        index = name.find( "." )
+
+        while index > 0:
+            yield name[:index]
+            index = name.find( ".", index + 1 )
+
+
 # Setup the alternate debugger, completely independent of the standard logging module Logger class
 root = Debugger( "root_debugger", "WARNING" )
 Debugger.root = root
 Debugger._file_context_filter = FileHandlerContextFilter()
 
-Debugger.manager = Manager( root )
+Debugger.manager = DebuggerManager( root )
 Debugger.manager.setLoggerClass( Debugger )
 
 
+# The loggers returned by previous `getLogger()` calls, the least recently used are discarded
+# after `_loggers_cache_size`, see `_getLogger()`
+_loggers_cache = OrderedDict()
+_loggers_cache_size = 4096
+
+# The `getLogger()` arguments with side effects which are not checked by the `_loggers_cache`
+_uncached_arguments = ( "level", "force", "handlers", "debugme" )
+
+
 def getLogger(debug_level=127, logger_name=None,
             file=EMPTY_KWARG, mode=EMPTY_KWARG, delete=EMPTY_KWARG, date=EMPTY_KWARG, levels=EMPTY_KWARG,
             function=EMPTY_KWARG, name=EMPTY_KWARG, time=EMPTY_KWARG, msecs=EMPTY_KWARG, tick=EMPTY_KWARG,
@@ -1600,8 +3019,21 @@ def getLogger(debug_level=127, logger_name=None,
 def _getLogger(debug_level=127, logger_name=None, **kwargs):
     """
         Allow to pass positional arguments to `getLogger()`.
+
+        Calls repeating the same arguments return the logger cached by `_loggers_cache`, while
+        calling `getLogger()` again would not change it, see `_get_cached_state()`.
     """
+    cache_key = _get_cache_key( debug_level, logger_name, kwargs )
+
+    if cache_key and not Debugger._debugme:
+        cached = _loggers_cache.pop( cache_key, None )
+
+        if cached and cached[1:] == _get_cached_state( cached[0], kwargs.get( "setup", True ), kwargs.get( "active", True ) ):
+            _loggers_cache[cache_key] = cached
+            return cached[0]
+
     level = kwargs.get( "level", EMPTY_KWARG )
+    active = kwargs.get( "active", True )
     Debugger._debugme = kwargs.get( "debugme", False )
 
     try:
@@ -1610,6 +3042,7 @@ def _getLogger(debug_level=127, logger_name=None, **kwargs):
     except Exception as error:
         sys.stderr.write('%s\n\n' % error)
         debug_level, logger_name = 127, "logger"
+        cache_key = None
 
     logger = Debugger.manager.getLogger( logger_name )
     logger.debug_level = debug_level
@@ -1618,12 +3051,63 @@ def _getLogger(debug_level=127, logger_name=None, **kwargs):
         kwargs.pop( "level" )
         logger.setLevel( level )
 
-    if kwargs.pop( "setup", True ) == True:
+    setup = kwargs.pop( "setup", True )
+
+    if setup == True:
         logger.setup( _fix_children=True, **kwargs )
 
+    if cache_key:
+        _loggers_cache.pop( cache_key, None )
+
+        while len( _loggers_cache ) >= _loggers_cache_size:
+            _loggers_cache.popitem( last=False )
+
+        _loggers_cache[cache_key] = ( logger, ) + _get_cached_state( logger, setup, active )
+
     return logger
 
 
+def _get_cached_state(logger, setup, active):
+    """
+        Return the state which decides what a `getLogger()` call would change on the `logger`, i.e.,
+        its debug level, whether it is still registered, and when `setup` is used, the logger set
+        up, as selected by the `active` argument, its handlers, `_arguments` and `_force_debug`.
+    """
+    registered = Debugger.manager.loggerDict.get( logger.name ) is logger
+
+    if setup != True:
+        return ( logger._debugger_level, registered )
+
+    target = logger.active or logger if active else logger
+    has_handlers = bool( target._stream or target._file )
+    return ( logger._debugger_level, registered, target, has_handlers, dict( target._arguments ), target._force_debug )
+
+
+def _get_cache_key(debug_level, logger_name, kwargs):
+    """
+        Return the `_loggers_cache` key of a `getLogger()` call, or None if it cannot be cached, as
+        when some of its arguments is unhashable or one of the `_uncached_arguments`.
+    """
+    arguments = []
+
+    for argument, value in kwargs.items():
+
+        if value != EMPTY_KWARG:
+
+            if argument in _uncached_arguments:
+                return None
+
+            arguments.append( ( argument, value ) )
+
+    try:
+        cache_key = ( debug_level, logger_name, frozenset( arguments ) )
+        hash( cache_key )
+        return cache_key
+
+    except TypeError:
+        return None
+
+
 def _get_debug_level(debug_level, logger_name):
 
     if isinstance( debug_level, str ):
@@ -0,0 +1,177 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+####################### Licensing #######################################################
+#
+#   Copyright 2018 @ Evandro Coan
+#   Memory mapped ring buffer log sink
+#
+#  Redistributions of source code must retain the above
+#  copyright notice, this list of conditions and the
+#  following disclaimer.
+#
+#  Redistributions in binary form must reproduce the above
+#  copyright notice, this list of conditions and the following
+#  disclaimer in the documentation and/or other materials
+#  provided with the distribution.
+#
+#  Neither the name Evandro Coan nor the names of any
+#  contributors may be used to endorse or promote products
+#  derived from this software without specific prior written
+#  permission.
+#
+#  This program is free software; you can redistribute it and/or modify it
+#  under the terms of the GNU General Public License as published by the
+#  Free Software Foundation; either version 3 of the License, or ( at
+#  your option ) any later version.
+#
+#  This program is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+#  General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#########################################################################################
+#
+
+import os
+import re
+import mmap
+import struct
+import logging
+
+# The file header is the magic, the next write offset and the total of bytes ever written
+RING_MAGIC = b"DTRING02"
+RING_HEADER = struct.Struct( "<8sQQ" )
+
+# Separates the records on the ring, so multiline records as tracebacks can be reconstructed
+RECORD_SEPARATOR = b"\0"
+
+# Escapes the separator inside the records, as `\x01\x02`, and the escape itself, as `\x01\x01`
+RECORD_ESCAPE = b"\x01"
+_escaped_sequence = re.compile( b"\x01(.)", re.DOTALL )
+
+
+class RingBufferHandler(logging.Handler):
+    """
+        Writes the formatted records into a fixed size `mmap` backed circular file, overwriting the
+        oldest records when it is full. As the memory map pages belong to the operating system,
+        the last records survive a process crash and can be read back with `read_ring_buffer()`.
+
+        If the file already exists with the same size, the writing continues after its last record.
+
+        @param `filename`  the path to the ring buffer file
+        @param `size`      the ring buffer size in Mega Bytes, not counting its header
+    """
+
+    def __init__(self, filename, size=1):
+        super( RingBufferHandler, self ).__init__()
+        self.baseFilename = os.path.abspath( filename )
+        self.capacity = max( 1, int( size * 1024 * 1024 ) )
+
+        file_size = RING_HEADER.size + self.capacity
+        mode = 'r+b' if os.path.exists( self.baseFilename ) else 'w+b'
+
+        self._file = open( self.baseFilename, mode )
+        is_reusable = os.path.getsize( self.baseFilename ) == file_size
+
+        if not is_reusable:
+            self._file.truncate( file_size )
+
+        self._map = mmap.mmap( self._file.fileno(), file_size )
+        magic, self._offset, self._total = RING_HEADER.unpack_from( self._map, 0 )
+
+        if not is_reusable or magic != RING_MAGIC or self._offset >= self.capacity:
+            self._offset = 0
+            self._total = 0
+            RING_HEADER.pack_into( self._map, 0, RING_MAGIC, 0, 0 )
+
+    def emit(self, record):
+
+        try:
+            data = self.format( record ).encode( 'utf-8', 'replace' )
+            data = data.replace( RECORD_ESCAPE, b"\x01\x01" ).replace( RECORD_SEPARATOR, b"\x01\x02" )
+            data += RECORD_SEPARATOR
+            self._write( data )
+
+        except Exception:
+            self.handleError( record )
+
+    def _write(self, data):
+        capacity = self.capacity
+        data_size = len( data )
+
+        if data_size > capacity:
+            data = data[-capacity:]
+            data_size = capacity
+
+        start = RING_HEADER.size + self._offset
+        first_part = capacity - self._offset
+
+        if data_size <= first_part:
+            self._map[start:start + data_size] = data
+
+        else:
+            self._map[start:start + first_part] = data[:first_part]
+            self._map[RING_HEADER.size:RING_HEADER.size + data_size - first_part] = data[first_part:]
+
+        self._offset = ( self._offset + data_size ) % capacity
+        self._total += data_size
+        RING_HEADER.pack_into( self._map, 0, RING_MAGIC, self._offset, self._total )
+
+    def flush(self):
+
+        if self._map:
+            self._map.flush()
+
+    def close(self):
+        self.acquire()
+
+        try:
+            if self._map:
+                self._map.close()
+                self._file.close()
+                self._map = None
+
+        finally:
+            self.release()
+
+        super( RingBufferHandler, self ).close()
+
+
+def read_ring_buffer(filename):
+    """
+        Return the list of records written into the ring buffer file `filename`, from the oldest
+        to the newest one. After the ring wraps around, its oldest record is discarded, as it may
+        be partially overwritten.
+    """
+
+    with open( filename, 'rb' ) as file:
+        contents = file.read()
+
+    magic, offset, total = RING_HEADER.unpack_from( contents, 0 )
+
+    if magic != RING_MAGIC:
+        raise ValueError( "Error: The file `%s` is not a ring buffer log file!" % filename )
+
+    data = contents[RING_HEADER.size:]
+
+    if total <= len( data ):
+        data = data[:total]
+
+    else:
+        data = data[offset:] + data[:offset]
+        data = data[data.find( RECORD_SEPARATOR ) + 1:]
+
+    records = data.split( RECORD_SEPARATOR )[:-1]
+    return [_unescape( record ).decode( 'utf-8', 'replace' ) for record in records]
+
+
+def _unescape(record):
+
+    if RECORD_ESCAPE not in record:
+        return record
+
+    return _escaped_sequence.sub( lambda match: RECORD_SEPARATOR if match.group( 1 ) == b"\x02" else RECORD_ESCAPE, record )
@@ -104,7 +104,6 @@ class stderr_replacement(object):
             _stderr_write = _stderr_default.write
 
             logger_call = logger._log_clean
-            clean_formatter = logger.clean_formatter
 
             global _sys_stderr_write
             global _sys_stderr_write_hidden
@@ -168,16 +167,13 @@ class stderr_replacement(object):
                     file = logger._file
                     _stderr_write( msg, *args, **kwargs )
 
-                    formatter = file.formatter
+                    # The JSON records always need their terminator to be split by lines
                     terminator = file.terminator
-
-                    file.formatter = clean_formatter
-                    file.terminator = ""
+                    file.terminator = terminator if logger._arguments['json'] else ""
 
                     kwargs['extra'] = { '_duplicated_from_file': True }
                     logger_call( msg, args, kwargs )
 
-                    file.formatter = formatter
                     file.terminator = terminator
 
                 except Exception:
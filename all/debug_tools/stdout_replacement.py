@@ -111,7 +111,6 @@ class stdout_replacement(object):
             _stdout_write = _stdout_default.write
 
             logger_call = logger._log_clean
-            clean_formatter = logger.clean_formatter
 
             global _sys_stdout_write
             global _sys_stdout_write_hidden
@@ -175,16 +174,13 @@ class stdout_replacement(object):
                     file = logger._file
                     _stdout_write( msg, *args, **kwargs )
 
-                    formatter = file.formatter
+                    # The JSON records always need their terminator to be split by lines
                     terminator = file.terminator
-
-                    file.formatter = clean_formatter
-                    file.terminator = ""
+                    file.terminator = terminator if logger._arguments['json'] else ""
 
                     kwargs['extra'] = { '_duplicated_from_file': True }
                     logger_call( msg, args, kwargs )
 
-                    file.formatter = formatter
                     file.terminator = terminator
 
                 except Exception:
@@ -53,14 +53,20 @@ import textwrap
 
 from collections import OrderedDict
 
-try:
-    from natsort import natsorted
+def natsorted(*args, **kwargs):
+    """
+        Call `natsort.natsorted()`, only importing the optional natsort library when some function
+        sorts with it, instead of when this module is imported.
+    """
 
-except( ImportError, ValueError ):
+    try:
+        from natsort import natsorted
 
-    def natsorted(*args, **kwargs):
+    except( ImportError, ValueError ):
         raise RuntimeError( "The library natsort is required to run this function.\nYou can install it with `pip install natsort`" )
 
+    return natsorted( *args, **kwargs )
+
 try:
     import diff_match_patch
 
@@ -39,8 +39,13 @@
 import re
 import os
 import sys
+import time
 
+import json
+import logging
+import threading
 import unittest
+import subprocess
 import inspect
 import traceback
 
@@ -78,6 +83,9 @@ except ImportError:
     from debug_tools import testing_utilities
     from debug_tools import TeeNoFile
 
+from debug_tools.ring_buffer import read_ring_buffer
+from debug_tools.binary_log import read_binary_log
+
 
 # We need to keep a global reference to this because the logging module internally grabs an
 # reference to the first `sys.strerr` it can get its hands on it.
@@ -120,6 +128,16 @@ def log_traceback(ex, ex_traceback=None):
     sys.stderr.write( "\n".join( tb_lines ) )
 
 
+class RecordsHandler(logging.Handler):
+
+    def __init__(self):
+        super(RecordsHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append( record )
+
+
 class StdErrUnitTests(testing_utilities.MultipleAssertionFailures):
     """
         How to assert output with nosetest/unittest in python?
@@ -308,6 +326,204 @@ class StdErrUnitTests(testing_utilities.MultipleAssertionFailures):
             """ ),
             output )
 
+    def test_disabled_levels_table_update(self):
+        getLogger( 1, function=False )
+        log( 4, "Disabled" )
+        log( 4 )
+
+        log.debug_level = 4
+        log( 4, "Enabled" )
+        log( 4 )
+
+        log._debug_level = 5
+        log( 4 )
+
+        # The tables are shared by the loggers with the same `debug_level`
+        enabled_levels = log._enabled_levels
+        log.debug_level = 5
+        self.assertIs( enabled_levels, log._enabled_levels )
+        self.assertIs( enabled_levels, debug_tools.logger.getLogger( 5, "enabled_levels_table" )._enabled_levels )
+
+        output = _stderr.contents( r"\d{2}:\d{2}:\d{2}:\d{3}\.\d{6} \d\.\d{2}e.\d{2} \- " )
+        self.assertEqual( utilities.wrap_text( """\
+            logger - 4
+            logger - Enabled
+            logger - 4
+            """ ),
+            output )
+
+    def test_negative_levels_bitwise_test(self):
+        getLogger( 1, function=False )
+        log.debug_level = 128
+
+        log( -1, "Negative %s", -1 )
+        log( -128, "Negative %s", -128 )
+        log( -129, "Disabled" )
+        log( 127, "Disabled" )
+
+        log.debug_level = 1
+        log( -1, "Negative %s", -1 )
+        log( -2, "Disabled" )
+
+        log.debug_level = 3
+        log( -2, "Negative %s", -2 )
+        log( -127, "Negative %s", -127 )
+        log( -128, "Disabled" )
+
+        output = _stderr.contents( r"\d{2}:\d{2}:\d{2}:\d{3}\.\d{6} \d\.\d{2}e.\d{2} \- " )
+        self.assertEqual( utilities.wrap_text( """\
+            logger - Negative -1
+            logger - Negative -128
+            logger - Negative -1
+            logger - Negative -2
+            logger - Negative -127
+            """ ),
+            output )
+
+    def test_bitwise_logger_rebinding(self):
+        getLogger( 1, function=False )
+        log4 = log.bitwise( 4 )
+        log4( "Disabled" )
+
+        log.debug_level = 4
+        log4( "Enabled %s", 4 )
+
+        log._debug_level = 1
+        log4( "Disabled again" )
+        self.assertIs( log4, log.bitwise( 4 ) )
+
+        output = _stderr.contents( r"\d{2}:\d{2}:\d{2}:\d{3}\.\d{6} \d\.\d{2}e.\d{2} \- " )
+        self.assertEqual( utilities.wrap_text( """\
+            logger - Enabled 4
+            """ ),
+            output )
+
+    def test_caller_location_only_when_formatted(self):
+        getLogger( 1, function=False )
+        handler = RecordsHandler()
+        handler.setFormatter( logging.Formatter( "%(message)s" ) )
+        log.addHandler( handler )
+        log( "Something..." )
+        log.removeHandler( handler )
+
+        handler.setFormatter( logging.Formatter( "%(funcName)s - %(message)s" ) )
+        log.addHandler( handler )
+        log( "Something else..." )
+        log.removeHandler( handler )
+
+        # The handlers without formatter pass the records on, as logging.handlers.QueueHandler
+        handler.setFormatter( None )
+        log.addHandler( handler )
+        log( "Something forwarded..." )
+        log.removeHandler( handler )
+
+        # The formatter replaced while the handler is attached
+        handler.setFormatter( logging.Formatter( "%(message)s" ) )
+        log.addHandler( handler )
+        log( "Something replaced..." )
+        handler.setFormatter( logging.Formatter( "%(funcName)s:%(lineno)d %(message)s" ) )
+        log( "Something replaced again..." )
+        handler.setFormatter( logging.Formatter( "%(message)s" ) )
+
+        # The filters of the handler and the logger can read the caller location
+        filtered = []
+
+        class CallerFilter(logging.Filter):
+            def filter(self, record):
+                filtered.append( ( record.funcName, record.lineno ) )
+                return True
+
+        caller_filter = CallerFilter()
+
+        handler.addFilter( caller_filter )
+        log( "Something filtered..." )
+        handler.removeFilter( caller_filter )
+
+        log.addFilter( caller_filter )
+        log( "Something filtered again..." ); filtered_line = inspect.currentframe().f_lineno
+        log.removeFilter( caller_filter )
+        log.removeHandler( handler )
+
+        function_name = "test_caller_location_only_when_formatted"
+        self.assertEqual( "(unknown function)", handler.records[0].funcName )
+        self.assertEqual( function_name, handler.records[1].funcName )
+        self.assertEqual( function_name, handler.records[2].funcName )
+        self.assertEqual( "(unknown function)", handler.records[3].funcName )
+        self.assertEqual( function_name, handler.records[4].funcName )
+        self.assertEqual( [ ( function_name, filtered_line - 4 ), ( function_name, filtered_line ) ], filtered )
+
+    def test_record_formatter_selection(self):
+        getLogger( 1, function=False )
+        formatter = log._stream.formatter
+
+        records_formatter = logging.Formatter( "%(message)s" )
+        records_handler = RecordsHandler()
+        records_handler.setFormatter( records_formatter )
+        log.addHandler( records_handler )
+
+        log.clean( 1, "Clean" )
+        log.basic( 1, "Basic" )
+        log( 1, "Override", time=False, msecs=False, tick=False )
+        self.assertIs( formatter, log._stream.formatter )
+        self.assertIs( records_formatter, records_handler.formatter )
+
+        log.removeHandler( records_handler )
+        self.assertEqual( [ "Clean", "Basic", "Override" ],
+                [ records_handler.format( record ) for record in records_handler.records ] )
+
+        output = _stderr.contents( r"\d{2}:\d{2}:\d{2}:\d{3}\.\d{6} \- " )
+        self.assertEqual( utilities.wrap_text( """\
+            Clean
+            logger - Basic
+            logger - Override
+            """ ),
+            output )
+
+    def test_user_handler_formatter_selection(self):
+        getLogger( 1, function=False )
+
+        class FormattingHandler(RecordsHandler):
+            def emit(self, record):
+                self.records.append( ( record, self.format( record ) ) )
+
+        user_formatter = logging.Formatter( "%(asctime)s %(funcName)s: %(message)s" )
+        user_handler = FormattingHandler()
+        user_handler.setFormatter( user_formatter )
+        log.addHandler( user_handler )
+
+        log.clean( 1, "Clean line" )
+        log.basic( 1, "Basic line" )
+        log( 1, "Full line" )
+
+        log.removeHandler( user_handler )
+        self.assertIs( user_formatter, user_handler.formatter )
+
+        ( clean, clean_line ), ( basic, basic_line ), ( full, full_line ) = user_handler.records
+        self.assertEqual( "Clean line", clean_line )
+        self.assertEqual( log.basic_formatter.format( basic ), basic_line )
+        self.assertEqual( user_formatter.format( full ), full_line )
+        self.assertTrue( full_line.endswith( " test_user_handler_formatter_selection: Full line" ), full_line )
+
+    def test_override_formatters_cache(self):
+        getLogger( 1, function=False )
+
+        for index in range( 3 ):
+            log( 1, "Override", time=False, msecs=False, tick=False )
+
+        self.assertEqual( 1, len( log._override_formatters ) )
+        log.setup( name=False )
+        self.assertEqual( 0, len( log._override_formatters ) )
+        log( 1, "Override", time=False, msecs=False, tick=False )
+
+        output = _stderr.contents()
+        self.assertEqual( utilities.wrap_text( """\
+            logger - Override
+            logger - Override
+            logger - Override
+            Override
+            """ ),
+            output )
+
     def test_fast_log_setup_activation(self):
         getLogger( 1, fast=True )
         log( 2 )
@@ -581,6 +797,59 @@ class LogRecordUnitTests(testing_utilities.MultipleAssertionFailures):
             utilities.wrap_text( output, trim_spaces='+' ) )
 
 
+    def test_interned_message_templates(self):
+        getLogger( 127, "testing.main_unit_tests" )
+
+        for index in range( 2 ):
+            log.clean( "Interned %s and %d", "first", index, "trailing", index )
+            log.clean( "Interned mismatch %d", "first", index )
+
+        output = _stderr.contents( r"" )
+        templates = debug_tools.logger.get_message_templates()
+
+        self.assertEqual( 2, templates["Interned %s and %d"] )
+        self.assertEqual( 2, templates["Interned mismatch %d"] )
+
+        self.assertEqual( utilities.wrap_text( """\
+            Interned first and 0 trailing 0
+            Interned mismatch %d first 0
+            Interned first and 1 trailing 1
+            Interned mismatch %d first 1
+            """ ),
+            output )
+
+    def test_message_template_arguments(self):
+        count_arguments = debug_tools.logger.MessageTemplate._count_arguments
+
+        self.assertEqual( 0, count_arguments( "No conversions" ) )
+        self.assertEqual( 0, count_arguments( "100%% done" ) )
+        self.assertEqual( 2, count_arguments( "%s and %-5.2f" ) )
+        self.assertEqual( 4, count_arguments( "%*d and %.*s" ) )
+        self.assertEqual( None, count_arguments( "%(name)s" ) )
+        self.assertEqual( None, count_arguments( "100%" ) )
+
+        getLogger( 127, "testing.main_unit_tests" )
+        log.clean( "Star %*d", 3, 7, "trailing", 1, 2 )
+        log.clean( "Mapping %(name)s", "trailing" )
+
+        output = _stderr.contents( r"" )
+        self.assertEqual( utilities.wrap_text( """\
+            Star   7 trailing 1 2
+            Mapping %(name)s trailing
+            """ ),
+            output )
+
+    def test_clean_record_constant_attributes(self):
+        record = debug_tools.logger.CleanLogRecord( logging.DEBUG, "clean", "Message %s", ( 1, ),
+                { "extra": { "_duplicated_from_file": True, "lineno": 10 } } )
+
+        formatter = logging.Formatter( "%(name)s %(levelname)s %(pathname)s:%(lineno)d %(thread)s - %(message)s" )
+        self.assertEqual( "clean DEBUG No Path Name:0 None - Message 1", formatter.format( record ) )
+
+        self.assertEqual( "No Function", record.funcName )
+        self.assertFalse( hasattr( record, "unknown" ) )
+        self.assertFalse( debug_tools.logger.FileHandlerContextFilter().filter( record ) )
+
 class SetupFormattingSpacingUnitTests(testing_utilities.MultipleAssertionFailures):
 
     def setUp(self):
@@ -599,7 +868,7 @@ class SetupFormattingSpacingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_not_time:\d\d\d - Something..." )
+                r"\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_not_time:\d+ - Something..." )
 
     def test_not_time_msecs(self):
         getLogger( 1, time=0, msecs=0 )
@@ -607,7 +876,7 @@ class SetupFormattingSpacingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d.\d\de(\+|\-)\d\d - logger.test_not_time_msecs:\d\d\d - Something..." )
+                r"\d.\d\de(\+|\-)\d\d - logger.test_not_time_msecs:\d+ - Something..." )
 
     def test_not_time_msecs_tick(self):
         getLogger( 1, time=0, msecs=0, tick=0 )
@@ -615,7 +884,7 @@ class SetupFormattingSpacingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"logger.test_not_time_msecs_tick:\d\d\d - Something..." )
+                r"logger.test_not_time_msecs_tick:\d+ - Something..." )
 
     def test_not_time_msecs_tick_name(self):
         getLogger( 1, time=0, msecs=0, tick=0, name=0 )
@@ -623,7 +892,7 @@ class SetupFormattingSpacingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"test_not_time_msecs_tick_name:\d\d\d - Something..." )
+                r"test_not_time_msecs_tick_name:\d+ - Something..." )
 
     def test_not_time_msecs_tick_name_function(self):
         getLogger( 1, time=0, msecs=0, tick=0, name=0, function=0 )
@@ -676,7 +945,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_default_logger_creation:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_default_logger_creation:\d+ - Something..." )
 
     def test_logger_name_string_string(self):
         getLogger( "", "mylogger" )
@@ -684,7 +953,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - mylogger.test_logger_name_string_string:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - mylogger.test_logger_name_string_string:\d+ - Something..." )
 
     def test_logger_name_string_int(self):
         getLogger( "", 3 )
@@ -693,7 +962,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_string_int:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_string_int:\d+ - Something..." )
 
     def test_logger_name_string_empty(self):
         getLogger( "", "" )
@@ -702,7 +971,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_string_empty:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_string_empty:\d+ - Something..." )
 
     def test_logger_name_int_empty(self):
         getLogger( 3, "" )
@@ -711,7 +980,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_int_empty:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_int_empty:\d+ - Something..." )
 
     def test_logger_name_int_int(self):
         getLogger( 3, "" )
@@ -720,7 +989,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_int_int:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_int_int:\d+ - Something..." )
 
     def test_logger_name_none_int(self):
         getLogger( None, "" )
@@ -729,7 +998,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_none_int:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_none_int:\d+ - Something..." )
 
     def test_logger_name_empty_none(self):
         getLogger( "", None )
@@ -738,7 +1007,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_empty_none:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_empty_none:\d+ - Something..." )
 
     def test_logger_name_none_none(self):
         getLogger( None, None )
@@ -747,7 +1016,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_none_none:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d:\d\d\d.\d\d\d\d\d\d \d.\d\de(\+|\-)\d\d - logger.test_logger_name_none_none:\d+ - Something..." )
 
     def test_not_msecs(self):
         getLogger( 1 )
@@ -755,7 +1024,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d \d.\d\de(\+|\-)\d\d - logger.test_not_msecs:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d \d.\d\de(\+|\-)\d\d - logger.test_not_msecs:\d+ - Something..." )
 
     def test_not_msecs_tick(self):
         getLogger( 1 )
@@ -763,7 +1032,7 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"\d\d:\d\d:\d\d - logger.test_not_msecs_tick:\d\d\d - Something..." )
+                r"\d\d:\d\d:\d\d - logger.test_not_msecs_tick:\d+ - Something..." )
 
     def test_not_msecs_tick_time(self):
         getLogger( 1 )
@@ -771,8 +1040,610 @@ class DynamicSetupFormattingUnitTests(testing_utilities.MultipleAssertionFailure
 
         output = _stderr.contents()
         self.assertRegexpMatches( output,
-                r"logger.test_not_msecs_tick_time:\d\d\d - Something..." )
+                r"logger.test_not_msecs_tick_time:\d+ - Something..." )
+
+
+class FormatterUnitTests(testing_utilities.MultipleAssertionFailures):
+    """
+        Test the Debugger formatters output against the standard logging.Formatter.
+    """
+
+    def setUp(self):
+        super(FormatterUnitTests, self).setUp()
+
+        sys.stderr.write("\n")
+        sys.stderr.write("\n")
+
+    def tearDown(self):
+        super(FormatterUnitTests, self).tearDown()
+
+        log.clear( True )
+        log.reset()
+
+    def test_debugger_formatter_conformance(self):
+        getLogger( 1, date=True, levels=True )
+        formatter = log.full_formatter
+        standard = logging.Formatter( formatter._fmt, formatter.datefmt )
+
+        self.assertIsInstance( formatter, debug_tools.logger.DebuggerFormatter )
+        records_handler = RecordsHandler()
+        log.addHandler( records_handler )
+
+        log( 1, "Formatted %s", 1, "trailing" )
+        log( 1, "Formatted 100%% %(name)s", { "name": "value" } )
+
+        try:
+            raise Exception( "Test Error" )
+
+        except Exception:
+            log.exception( "Formatted exception" )
+
+        log.removeHandler( records_handler )
+        self.assertEqual( 3, len( records_handler.records ) )
+
+        for record in records_handler.records:
+            self.assertEqual( standard.format( record ), formatter.format( record ) )
+
+
+    def test_shared_timestamp_cache(self):
+        format_timestamp = debug_tools.logger.format_timestamp
+        created = 1500000000.25
+
+        self.assertEqual( time.strftime( "%Y-%m-%d%H:%M:%S", time.localtime( created ) ),
+                format_timestamp( "%Y-%m-%d%H:%M:%S", created ) )
+
+        self.assertEqual( time.strftime( "%H:%M:%S", time.localtime( created ) ),
+                format_timestamp( "%H:%M:%S", created + 0.5 ) )
+
+        self.assertEqual( ( 1500000000, time.strftime( "%H:%M:%S", time.localtime( created ) ) ),
+                debug_tools.logger._timestamps[( "%H:%M:%S", time.localtime )] )
+
+    def test_json_lines_formatter(self):
+        getLogger( 1, create_test_file='main_unit_tests.txt', json=True )
+
+        log( 1, 'JSON "%s"', "quoted" )
+        log.clean( 1, "Clean\tline" )
+        log.basic( 1, "Basic" )
+
+        with open( log.output_file, 'r' ) as file:
+            records = [ json.loads( line ) for line in file.read().splitlines() ]
+
+        self.assertEqual( [ 'JSON "quoted"', "Clean\tline", "Basic" ], [ record['message'] for record in records ] )
+        self.assertEqual( ( "logger", 1, "DEBUG", "test_json_lines_formatter" ),
+                ( records[0]['name'], records[0]['debugLevel'], records[0]['levelname'], records[0]['funcName'] ) )
+
+        self.assertEqual( sorted( [ "name", "debugLevel", "levelname", "funcName", "lineno", "created",
+                "tickDifference", "message" ] ), sorted( records[0] ) )
+
+        log.setup( json=False )
+        self.assertEqual( logging.Formatter, type( log.clean_formatter ) )
+
+    def test_lazy_message_arguments(self):
+        getLogger( 1, "testing.main_unit_tests" )
+        calls = []
+
+        def representation(value):
+            calls.append( value )
+            return "<%s>" % value
+
+        log( 2, "Disabled %s", debug_tools.logger.lazy( representation, "disabled" ) )
+        self.assertEqual( [], calls )
+
+        records_handler = RecordsHandler()
+        log.addHandler( records_handler )
+        log.clean( 1, "Lazy %s %d", debug_tools.logger.lazy( representation, "enabled" ),
+                debug_tools.logger.lazy( len, "four" ), debug_tools.logger.lazy( representation, "trailing" ) )
+
+        output = _stderr.contents( r"" )
+        records_handler.format( records_handler.records[0] )
+        self.assertEqual( [ "enabled", "trailing" ], calls )
+
+        self.assertEqual( utilities.wrap_text( """\
+            Lazy <enabled> 4 <trailing>
+            """ ),
+            output )
+
+class HandlersUnitTests(testing_utilities.MultipleAssertionFailures):
+    """
+        Test the handlers created by the `setup()` file output options.
+    """
+
+    def setUp(self):
+        super(HandlersUnitTests, self).setUp()
+
+        sys.stderr.write("\n")
+        sys.stderr.write("\n")
+
+    def tearDown(self):
+        super(HandlersUnitTests, self).tearDown()
+
+        log.clear( True )
+        log.reset()
+
+    def test_asynchronous_file_logging(self):
+        getLogger( 1, create_test_file='main_unit_tests.txt', function=False, asynchronous=True )
+
+        for index in range( 3 ):
+            log( 1, "Queued %s", index )
+
+        log.flush()
+        output = _stderr.file_contents( log, r"\d{2}:\d{2}:\d{2}:\d{3}\.\d{6} \d\.\d{2}e.\d{2} \- " )
+
+        self.assertEqual( utilities.wrap_text( """\
+            logger - Queued 0
+            logger - Queued 1
+            logger - Queued 2
+            """ ),
+            output )
+
+    def test_asynchronous_handlers_closed_on_reset(self):
+        threads = threading.active_count()
+
+        for index in range( 3 ):
+            getLogger( 1, asynchronous=True, handlers=True )
+            log( 1, "Queued %s", index )
+
+        getLogger( 1, create_test_file='main_unit_tests.txt', asynchronous=True )
+        log.clear( True )
+        log.reset()
+
+        self.assertEqual( threads, threading.active_count() )
+
+    def test_buffered_file_logging(self):
+        getLogger( 1, create_test_file='main_unit_tests.txt', function=False, buffer=4096 )
+
+        log( 1, "Buffered" )
+        self.assertEqual( "", _stderr.file_contents( log ) )
+
+        log.warn( "Warning" )
+        output = _stderr.file_contents( log, r"\d{2}:\d{2}:\d{2}:\d{3}\.\d{6} \d\.\d{2}e.\d{2} \- " )
+
+        self.assertEqual( utilities.wrap_text( """\
+            logger - Buffered
+            logger - Warning
+            """ ),
+            output )
+
+    def test_buffered_file_single_flusher(self):
+        buffered_file = utilities.get_relative_path( 'main_unit_tests.buffered', __file__ )
+        handler = debug_tools.logger.BufferedFileHandler( buffered_file, 'w', interval=0.01 )
+        handler.formatter = logging.Formatter( "%(message)s" )
+
+        for index in range( 3 ):
+            handler.handle( logging.makeLogRecord( { "msg": "Record %s" % index, "levelno": logging.DEBUG } ) )
+            time.sleep( 0.2 )
+
+        with open( buffered_file ) as file:
+            contents = file.read()
+
+        flushers = [ thread for thread in threading.enumerate() if thread.name == "BufferedFileHandler" ]
+        flusher = handler._flusher
+
+        handler.close()
+        flusher.join( 5 )
+        os.remove( buffered_file )
+
+        self.assertEqual( "Record 0\nRecord 1\nRecord 2\n", contents )
+        self.assertEqual( [ flusher ], flushers )
+        self.assertFalse( flusher.is_alive() )
+
+    def test_buffered_file_with_rotation(self):
+        getLogger( 1 )
+        test_file = utilities.get_relative_path( 'main_unit_tests.txt', __file__ )
+
+        with self.assertRaises( ValueError ):
+            log.setup( file=test_file, buffer=4096, rotation=1 )
+
+    def test_ring_buffer_logging(self):
+        ring_file = utilities.get_relative_path( 'main_unit_tests.ring', __file__ )
+        getLogger( 1, function=False, time=False, msecs=False, tick=False, ring=ring_file, ring_size=0.0001 )
+
+        for index in range( 10 ):
+            log( 1, "Record %s", index )
+
+        records = read_ring_buffer( ring_file )
+        log.reset()
+        os.remove( ring_file )
+
+        self.assertEqual( [ "logger - Record %s" % index for index in range( 5, 10 ) ], records )
+
+    def test_ring_buffer_exactly_full(self):
+        ring_file = utilities.get_relative_path( 'main_unit_tests.ring', __file__ )
+
+        # Each record is written with 18 bytes, as `logger - Record 0\0`
+        getLogger( 1, function=False, time=False, msecs=False, tick=False, ring=ring_file, ring_size=72 / 1048576.0 )
+
+        for index in range( 4 ):
+            log( 1, "Record %s", index )
+
+        records = read_ring_buffer( ring_file )
+        log.reset()
+        os.remove( ring_file )
+
+        self.assertEqual( [ "logger - Record %s" % index for index in range( 4 ) ], records )
+
+        getLogger( 1, function=False, time=False, msecs=False, tick=False, ring=ring_file )
+        log( 1, "Separator %s and escape %s", "\0", "\x01\x02" )
+        log( 1, "Next" )
+
+        records = read_ring_buffer( ring_file )
+        log.reset()
+        os.remove( ring_file )
+
+        self.assertEqual( [ "logger - Separator \0 and escape \x01\x02", "logger - Next" ], records )
+
+    def test_binary_file_logging(self):
+        getLogger( 1, create_test_file='main_unit_tests.txt', binary=True )
+
+        records_handler = RecordsHandler()
+        records_handler.formatter = debug_tools.logger.RecordFormatter( log.full_formatter )
+        log.addHandler( records_handler )
+
+        for index in range( 3 ):
+            log( 1, "Deferred %s", index, "trailing" )
+
+        log( 1, "Not primitive %s", [ 1, 2 ] )
+        log( 1, "Mapping %(name)s", { "name": "value" } )
+        log.clean( 1, "Clean" )
+        log.warn( "Warning" )
+
+        log.removeHandler( records_handler )
+        output = "".join( records_handler.format( record ) + "\n" for record in records_handler.records )
+
+        self.assertEqual( output, "".join( read_binary_log( log.output_file ) ) )
+
+    def test_binary_file_size(self):
+        sizes = []
+
+        for test_file, binary in ( ( "main_unit_tests.txt", False ), ( "main_unit_tests.bin", True ) ):
+            getLogger( 1, create_test_file=test_file, binary=binary, mode='w' )
+
+            for index in range( 200 ):
+                log( 1, "processing item %s of %s", index, 200 )
+
+            log.flush()
+            sizes.append( os.path.getsize( log.output_file ) )
+
+        records = list( read_binary_log( log.output_file ) )
+
+        # Only the formatter attributes are written, and the repeated ones are written once
+        self.assertLess( sizes[1], sizes[0] * 0.75 )
+        self.assertEqual( 200, len( records ) )
+        self.assertTrue( records[-1].endswith( " - processing item 199 of 200\n" ), records[-1] )
+
+
+    def test_deduplicated_stream_logging(self):
+        getLogger( 1, time=False, msecs=False, tick=False, function=False, dedup=60 )
+
+        for index in range( 4 ):
+            log( 1, "Repeated" )
+
+        log( 1, "Different" )
+        log.clean( 1, "Clean" )
+        log.clean( 1, "Clean" )
+        log.removeHandlers()
+
+        output = _stderr.contents()
+        self.assertEqual( utilities.wrap_text( """\
+            logger - Repeated
+            logger - last message repeated 3 times
+            logger - Different
+            Clean
+            last message repeated 1 times
+            """ ),
+            output )
+
+    def test_deduplicated_call_sites(self):
+        getLogger( 1, time=False, msecs=False, tick=False, function=False, dedup=60 )
+
+        for index in range( 2 ):
+            log( 1, "Same" )
+            log( 1, "Same" )
+
+        log.removeHandlers()
+
+        output = _stderr.contents()
+        self.assertEqual( utilities.wrap_text( """\
+            logger - Same
+            logger - Same
+            logger - Same
+            logger - Same
+            """ ),
+            output )
+
+    def test_cached_debug_file_path(self):
+        import platform
+        logger = debug_tools.logger
+
+        platform_calls = []
+        platform_function = platform.platform
+        platform.platform = lambda *args: platform_calls.append( args ) or "Linux-4.4.0-19041-Microsoft-x86_64"
+
+        logger._path_translation = None
+        logger._translated_paths.clear()
+
+        try:
+            paths = [ logger.Debugger.get_debug_file_path( "/C:/Users/debug.txt" ) for index in range( 3 ) ]
+            relative_path = logger.Debugger.get_debug_file_path( "debug.txt" )
+
+        finally:
+            platform.platform = platform_function
+            logger._path_translation = None
+            logger._translated_paths.clear()
+
+        self.assertEqual( 1, len( platform_calls ) )
+        self.assertEqual( [ "/mnt//C/Users/debug.txt" ] * 3, paths )
+        self.assertEqual( os.path.abspath( "debug.txt" ), relative_path )
+
+
+class CallSiteUnitTests(testing_utilities.MultipleAssertionFailures):
+    """
+        Test the per call site `sample`, `every` and `per_second` rate limiting arguments.
+    """
+
+    def setUp(self):
+        super(CallSiteUnitTests, self).setUp()
+
+        sys.stderr.write("\n")
+        sys.stderr.write("\n")
+
+    def tearDown(self):
+        super(CallSiteUnitTests, self).tearDown()
+
+        log.clear( True )
+        log.reset()
+
+    def test_every_and_per_second_limits(self):
+        getLogger( 1, time=False, msecs=False, tick=False, function=False )
+
+        first_line = inspect.currentframe().f_lineno + 3
+
+        for index in range( 7 ):
+            log( 1, "Every %s", index, every=3 )
+            log( 1, "Second %s", index, per_second=2 )
+            log( 1, "Never %s", index, sample=0.0 )
+            log.clean( 1, "Clean %s", index, every=4 )
+
+        output = _stderr.contents()
+        suppressed = sorted( log.suppressed_records().items(), key=lambda item: item[0][1] )
+
+        self.assertEqual( [ 4, 5, 7, 5 ], [ count for call_site, count in suppressed ] )
+        self.assertEqual( __file__.rstrip( "c" ), suppressed[0][0][0].rstrip( "c" ) )
+        self.assertEqual( list( range( first_line, first_line + 4 ) ), [ call_site[1] for call_site, count in suppressed ] )
+
+        self.assertEqual( utilities.wrap_text( """\
+            logger - Every 0
+            logger - Second 0
+            Clean 0
+            logger - Second 1
+            logger - Every 3
+            Clean 4
+            logger - Every 6
+            """ ),
+            output )
+
+    def test_thread_and_global_ticks(self):
+        getLogger( 1, time=False, msecs=False, function=False, global_tick=True )
+        records_handler = RecordsHandler()
+        log.addHandler( records_handler )
+
+        log( 1, "Main thread" )
+        time.sleep( 0.2 )
+
+        thread = threading.Thread( target=log, args=( 1, "Other thread" ) )
+        thread.start()
+        thread.join()
+
+        log( 1, "Main thread again" )
+        log.removeHandler( records_handler )
+        first, other, again = records_handler.records
+
+        self.assertGreater( other.tickDifference, 0.15 )
+        self.assertGreater( again.tickDifference, 0.15 )
+        self.assertLess( again.globalTickDifference, 0.15 )
+
+        self.assertRegexpMatches( _stderr.contents(),
+                r"\d\.\d\de-\d\d \d\.\d\de-\d\d - logger - Main thread again" )
+
+
+class SpanUnitTests(testing_utilities.MultipleAssertionFailures):
+    """
+        Test the `span()` and `timed()` timing spans.
+    """
+
+    def setUp(self):
+        super(SpanUnitTests, self).setUp()
+
+        sys.stderr.write("\n")
+        sys.stderr.write("\n")
+
+    def tearDown(self):
+        super(SpanUnitTests, self).tearDown()
+
+        log.clear( True )
+        log.reset()
+
+    def test_nested_spans(self):
+        getLogger( 1, time=False, msecs=False, tick=False, function=False )
+
+        @log.timed( 1 )
+        def query():
+            time.sleep( 0.01 )
+
+        with log.span( 1, "request" ):
+            query()
+
+            with log.span( 2, "disabled" ):
+                query()
+
+        histograms = log.span_histograms()
+        self.assertEqual( [ "request", "request/query" ], sorted( histograms ) )
+        self.assertEqual( 2, histograms["request/query"].count )
+        self.assertGreaterEqual( histograms["request/query"].minimum, 0.01 )
+
+        self.assertRegexpMatches( _stderr.contents(), utilities.wrap_text( """\
+            logger - request/query took \\d\\.\\d\\de-0\\d seconds
+            logger - request/query took \\d\\.\\d\\de-0\\d seconds
+            logger - request took \\d\\.\\d\\de-0\\d seconds
+            """ ) )
+
+
+class HierarchyUnitTests(testing_utilities.MultipleAssertionFailures):
+    """
+        Test the cached `active` logger resolution and the descendants index of the loggers hierarchy.
+    """
+
+    def setUp(self):
+        super(HierarchyUnitTests, self).setUp()
+
+        sys.stderr.write("\n")
+        sys.stderr.write("\n")
+
+    def tearDown(self):
+        super(HierarchyUnitTests, self).tearDown()
+
+        log.clear( True )
+        log.reset()
+
+    def test_cached_active_logger(self):
+        getLogger( 1, "hierarchy" )
+        manager = debug_tools.logger.Debugger.manager
+
+        deep = manager.getLogger( "hierarchy.b.c.d.e" )
+        self.assertIs( log, deep.active )
+
+        middle = manager.getLogger( "hierarchy.b.c" )
+        self.assertIs( middle, deep.parent )
+        self.assertIs( log, deep.active )
+
+        records_handler = RecordsHandler()
+        middle.addHandler( records_handler )
+        self.assertIs( middle, deep.active )
+
+        middle.removeHandler( records_handler )
+        middle.propagate = False
+        self.assertIsNone( deep.active )
+
+        middle.propagate = True
+        self.assertIs( log, deep.active )
+
+    def test_fix_children_descendants(self):
+        getLogger( 1, "descendants" )
+        manager = debug_tools.logger.Debugger.manager
+
+        for name in ( "descendants.a.b", "descendants.a", "descendantsother", "descendantsother.a", "other.descendants" ):
+            manager.getLogger( name )
+
+        children = []
+        log.fix_children( lambda logger: children.append( logger.name ) )
+        self.assertEqual( [ "descendants.a", "descendants.a.b" ], sorted( children ) )
+
+        manager.getLogger( "descendants.a.b" ).delete()
+        children = []
+        log.fix_children( lambda logger: children.append( logger.name ) )
+        self.assertEqual( [ "descendants.a" ], children )
+
+        # The root logger only visits the top level loggers
+        children = []
+        manager.root.fix_children( lambda logger: children.append( logger.name ) )
+
+        self.assertIn( "descendants", children )
+        self.assertIn( "descendantsother", children )
+        self.assertIn( "other.descendants", children )
+        self.assertNotIn( "descendants.a", children )
+        self.assertNotIn( "descendantsother.a", children )
+
+    def test_cached_get_logger(self):
+        getLogger( 1, "cached", time=False )
+        cached = debug_tools.logger.getLogger( 1, "cached", time=False )
+
+        self.assertIs( log, cached )
+        self.assertIs( log, debug_tools.logger._loggers_cache[( 1, "cached", frozenset( [ ( "time", False ) ] ) )][0] )
+
+        log.setup = lambda *args, **kwargs: self.fail( "The cached logger was setup again" )
+
+        try:
+            debug_tools.logger.getLogger( 1, "cached", time=False )
+
+        finally:
+            del log.setup
+
+        log.debug_level = 4
+        debug_tools.logger.getLogger( 1, "cached", time=False )
+        self.assertEqual( 1, log.debug_level )
+
+        log.setup( time=True )
+        debug_tools.logger.getLogger( 1, "cached", time=False )
+        self.assertFalse( log._arguments['time'] )
+
+    def test_cached_get_logger_validity(self):
+        getLogger( 1, "cached", time=False )
+        logger = debug_tools.logger
+
+        # Creating other loggers does not invalidate the cached ones
+        for index in range( 3 ):
+            logger.getLogger( 1, "cached.child%s" % index, time=False )
+
+        log.setup = lambda *args, **kwargs: self.fail( "The cached logger was setup again" )
+
+        try:
+            self.assertIs( log, logger.getLogger( 1, "cached", time=False ) )
+            self.assertIs( log, logger.getLogger( 1, "cached", time=False ) )
+
+        finally:
+            del log.setup
+
+        # The deleted loggers are not returned
+        log.delete()
+        self.assertIsNot( log, logger.getLogger( 1, "cached", time=False ) )
+
+        # The least recently used loggers are discarded
+        cache_size = logger._loggers_cache_size
+        logger._loggers_cache_size = 2
+
+        try:
+            logger.getLogger( 1, "cached", time=False )
+            logger.getLogger( 1, "cached.child0", time=False )
+            logger.getLogger( 1, "cached", time=False )
+            logger.getLogger( 1, "cached.child1", time=False )
+
+        finally:
+            logger._loggers_cache_size = cache_size
+
+        self.assertEqual( [ "cached", "cached.child1" ], [ key[1] for key in logger._loggers_cache ] )
+
+
+class ImportUnitTests(testing_utilities.MultipleAssertionFailures):
+    """
+        Test the `debug_tools` package import time.
+    """
+
+    @unittest.skipIf( sys.version_info < (3, 7), "The lazy package attributes require Python 3.7" )
+    def test_lazy_logging_import(self):
+        environment = dict( os.environ )
+        environment['PYTHONPATH'] = os.path.dirname( os.path.dirname( debug_tools.__file__ ) )
+
+        output = subprocess.check_output( [ sys.executable, "-c", utilities.wrap_text( """
+            import sys
+            import time
+
+            start = time.perf_counter()
+            from debug_tools import getLogger
+            duration = time.perf_counter() - start
+
+            print( duration )
+            print( " ".join( sorted( sys.modules ) ) )
+            """ ) ], env=environment, universal_newlines=True )
+
+        duration, modules = output.splitlines()
+        modules = modules.split()
+
+        self.assertLess( float( duration ), 0.5 )
+        self.assertEqual( [ "debug_tools", "debug_tools.logger" ],
+                [ module for module in modules if module.startswith( "debug_tools" ) ] )
 
+        for module in ( "platform", "inspect", "logging.handlers", "concurrent_log_handler", "natsort", "diff_match_patch" ):
+            self.assertNotIn( module, modules )
 
 def load_tests(loader, standard_tests, pattern):
     suite = unittest.TestSuite()